@@ -1,6 +1,10 @@
 """ATC TV Scheduler — Configuration."""
 
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+from pydantic import PrivateAttr
 from pydantic_settings import BaseSettings
 
 
@@ -40,16 +44,32 @@ class Settings(BaseSettings):
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
+    _default_versions: dict[str, str] = PrivateAttr(default_factory=dict)
+    _cache_path: Optional[Path] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        self._default_versions = {
+            self.BOARD_MAINBOARD: self.MAINBOARD_DEFAULT_VERSION,
+            self.BOARD_MODBOARD: self.MODBOARD_DEFAULT_VERSION,
+        }
+
     @property
     def cache_path(self) -> Path:
-        path = Path(self.cache_dir)
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        """Cache directory, created on first access only."""
+        if self._cache_path is None:
+            path = Path(self.cache_dir)
+            path.mkdir(parents=True, exist_ok=True)
+            self._cache_path = path
+        return self._cache_path
 
     def default_version(self, board_type: str) -> str:
-        if board_type == self.BOARD_MAINBOARD:
-            return self.MAINBOARD_DEFAULT_VERSION
-        return self.MODBOARD_DEFAULT_VERSION
+        return self._default_versions.get(board_type, self.MODBOARD_DEFAULT_VERSION)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance."""
+    return Settings()
 
 
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
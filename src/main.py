@@ -1,52 +1,100 @@
 """ATC TV Scheduler — FastAPI Application."""
 
+import asyncio
+import os
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from fastapi import FastAPI
+import aiosqlite
+from fastapi import Depends, FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from src.config import settings
-from src.models.database import init_db, get_db
+from src.models.database import (
+    init_db,
+    connect,
+    open_read_pool,
+    close_read_pool,
+    get_db,
+    write_transaction,
+)
 from src.routes import schedule, tv_display, dashboard
 from src.routes import templates as templates_router
-from src.services.swap import execute_midnight_swap, get_today, get_next_swap_time
+from src.services.fallback import start_fallback_worker, stop_fallback_worker
+from src.services.swap import (
+    SCHEDULE_TZ,
+    execute_midnight_swap,
+    get_today,
+    get_next_swap_time,
+    server_time_iso,
+    tick_server_time,
+)
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-scheduler = AsyncIOScheduler(timezone=settings.timezone)
+# Created in lifespan so importing this module doesn't pull in APScheduler
+scheduler: Optional["AsyncIOScheduler"] = None
 
 APP_VERSION = "2.0.0"
 
+HEALTH_CACHE_TTL_SECONDS = 2.0
+_health_cache: Optional[tuple[float, dict]] = None
+_health_lock = asyncio.Lock()
+
 
 async def midnight_swap_job():
     """Scheduled job: rotate cards at midnight."""
-    db = await get_db()
     try:
-        result = await execute_midnight_swap(db)
+        db = app.state.db
+        async with write_transaction(db):
+            result = await execute_midnight_swap(db)
         print(f"[SWAP] Midnight swap complete: {result}")
+        # Quiet time: fold the WAL back into the DB and shrink it to zero
+        async with write_transaction(db):
+            cursor = await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            busy, log_pages, checkpointed = await cursor.fetchone()
+        print(f"[SWAP] WAL checkpoint: busy={busy} log={log_pages} checkpointed={checkpointed}")
     except Exception as e:
         print(f"[SWAP] Error during midnight swap: {e}")
-    finally:
-        await db.close()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup/shutdown lifecycle."""
+    global scheduler
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
     # Startup
+    clock = asyncio.create_task(tick_server_time())
     await init_db()
     print(f"[INIT] Database initialized at {settings.database_path}")
 
+    # One long-lived connection shared by every request, plus read-only ones
+    app.state.db = await connect()
+    app.state.read_pool = await open_read_pool()
+
     # Seed sample templates on first run
-    await _seed_sample_templates()
+    async with write_transaction(app.state.db):
+        await _seed_sample_templates(app.state.db)
+
+    # Fallback-layer file writes run behind the request path
+    await start_fallback_worker(app.state.db)
 
     # Schedule midnight swap
+    scheduler = AsyncIOScheduler(timezone=SCHEDULE_TZ)
     scheduler.add_job(
         midnight_swap_job,
-        "cron",
-        hour=settings.swap_hour,
-        minute=settings.swap_minute,
+        CronTrigger(
+            hour=settings.swap_hour,
+            minute=settings.swap_minute,
+            timezone=SCHEDULE_TZ,
+        ),
         id="midnight_swap",
         replace_existing=True,
     )
@@ -58,39 +106,52 @@ async def lifespan(app: FastAPI):
     # Shutdown
     scheduler.shutdown(wait=False)
     print("[SHUTDOWN] Scheduler stopped")
+    clock.cancel()
+    await stop_fallback_worker()
+    await close_read_pool(app.state.read_pool)
+    await app.state.db.execute("PRAGMA optimize")  # refresh stale planner stats
+    await app.state.db.close()
 
 
-async def _seed_sample_templates():
+async def _seed_sample_templates(db: aiosqlite.Connection):
     """Seed sample card templates if none exist yet."""
-    from src.services.templates import list_templates, create_template
+    from src.services.templates import create_templates
+
+    cursor = await db.execute("SELECT 1 FROM card_templates LIMIT 1")
+    if await cursor.fetchone():
+        return  # Templates already exist
 
-    db = await get_db()
+    # Load sample templates from static directory
+    samples_dir = Path("src/static/samples")
     try:
-        existing = await list_templates(db)
-        if existing:
-            return  # Templates already exist
-
-        # Load sample templates from static directory
-        samples_dir = Path("src/static/samples")
-        if not samples_dir.exists():
-            return
-
-        sample_meta = {
-            "legs_and_loaded.html": ("Legs & Loaded", "mainboard", "rx"),
-            "flexecution_day.html": ("Flexecution Day", "mainboard", "rx"),
-            "legs_web.html": ("Legs Web — 5 Round Challenge", "mainboard", "rx"),
-            "bermuda_triangle.html": ("Bermuda Triangle", "modboard", "mod"),
-            "leg_relay.html": ("Leg Relay", "mainboard", "rx"),
-        }
-
-        for filename, (name, board_type, version) in sample_meta.items():
-            filepath = samples_dir / filename
-            if filepath.exists():
-                html = filepath.read_text(encoding="utf-8")
-                await create_template(db, name, board_type, html, version)
-                print(f"[INIT] Seeded template: {name}")
-    finally:
-        await db.close()
+        with os.scandir(samples_dir) as entries:
+            available = {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return
+
+    sample_meta = {
+        "legs_and_loaded.html": ("Legs & Loaded", "mainboard", "rx"),
+        "flexecution_day.html": ("Flexecution Day", "mainboard", "rx"),
+        "legs_web.html": ("Legs Web — 5 Round Challenge", "mainboard", "rx"),
+        "bermuda_triangle.html": ("Bermuda Triangle", "modboard", "mod"),
+        "leg_relay.html": ("Leg Relay", "mainboard", "rx"),
+    }
+    present = [filename for filename in sample_meta if filename in available]
+
+    # Read the files off the event loop, concurrently
+    htmls = await asyncio.gather(*[
+        asyncio.to_thread((samples_dir / filename).read_text, encoding="utf-8")
+        for filename in present
+    ])
+
+    seeded = []
+    for filename, html in zip(present, htmls):
+        name, board_type, version = sample_meta[filename]
+        seeded.append((name, board_type, html, version))
+
+    await create_templates(db, seeded)
+    for name, *_ in seeded:
+        print(f"[INIT] Seeded template: {name}")
 
 
 app = FastAPI(
@@ -100,6 +161,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Compress card HTML and schedule JSON; tiny responses aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
 
@@ -113,62 +177,73 @@ app.include_router(templates_router.router)
 @app.get("/")
 async def root():
     """Root endpoint — redirect to dashboard."""
-    from fastapi.responses import RedirectResponse
     return RedirectResponse(url="/dashboard")
 
 
 @app.get("/health")
-async def health():
-    """Enhanced health check with system diagnostics."""
-    db = await get_db()
-    try:
-        # DB check
-        cursor = await db.execute("SELECT COUNT(*) FROM tv_schedule")
-        schedule_count = (await cursor.fetchone())[0]
-
-        cursor = await db.execute(
-            "SELECT COUNT(*) FROM tv_schedule WHERE status = 'live'"
-        )
-        live_count = (await cursor.fetchone())[0]
-
-        cursor = await db.execute("SELECT COUNT(*) FROM card_templates")
-        template_count = (await cursor.fetchone())[0]
-
-        # Cache check
-        cache_path = settings.cache_path
-        cache_files = list(cache_path.glob("*.html"))
-
-        # JSON backup check
-        backup_path = Path(settings.backup_json_path)
-
-        # Scheduler check
-        next_swap = get_next_swap_time()
-        scheduler_running = scheduler.running
-
-        return {
-            "status": "ok",
-            "service": "arize-tv-scheduler",
-            "version": APP_VERSION,
-            "timestamp": datetime.now().isoformat(),
-            "auth_enabled": bool(settings.api_key),
-            "database": {
-                "path": settings.database_path,
-                "total_entries": schedule_count,
-                "live_cards": live_count,
-                "templates": template_count,
-            },
-            "fallback": {
-                "cache_files": len(cache_files),
-                "json_backup_exists": backup_path.exists(),
-                "json_backup_size": backup_path.stat().st_size if backup_path.exists() else 0,
-            },
-            "scheduler": {
-                "running": scheduler_running,
-                "next_swap_at": next_swap.isoformat(),
-                "swap_time": f"{settings.swap_hour:02d}:{settings.swap_minute:02d}",
-                "timezone": settings.timezone,
-            },
-            "today": str(get_today()),
-        }
-    finally:
-        await db.close()
+async def health(db: aiosqlite.Connection = Depends(get_db)):
+    """Enhanced health check with system diagnostics.
+
+    Cached for HEALTH_CACHE_TTL_SECONDS so frequent liveness probes are
+    answered from memory; the lock keeps concurrent probes from all
+    recomputing at once when the entry expires.
+    """
+    global _health_cache
+    if _health_cache and time.monotonic() - _health_cache[0] < HEALTH_CACHE_TTL_SECONDS:
+        return _health_cache[1]
+
+    async with _health_lock:
+        if _health_cache and time.monotonic() - _health_cache[0] < HEALTH_CACHE_TTL_SECONDS:
+            return _health_cache[1]
+        result = await _compute_health(db)
+        _health_cache = (time.monotonic(), result)
+        return result
+
+
+async def _compute_health(db: aiosqlite.Connection) -> dict:
+    """Gather the /health diagnostics."""
+    # DB check — all three counts in one round-trip
+    cursor = await db.execute(
+        """SELECT
+             (SELECT COUNT(*) FROM tv_schedule),
+             (SELECT COUNT(*) FROM tv_schedule WHERE status = 'live'),
+             (SELECT COUNT(*) FROM card_templates)"""
+    )
+    schedule_count, live_count, template_count = await cursor.fetchone()
+
+    # Cache check (scandir avoids a stat per file)
+    with os.scandir(settings.cache_path) as entries:
+        cache_file_count = sum(1 for entry in entries if entry.name.endswith(".html"))
+
+    # JSON backup check
+    backup_path = Path(settings.backup_json_path)
+
+    # Scheduler check
+    next_swap = get_next_swap_time()
+    scheduler_running = scheduler is not None and scheduler.running
+
+    return {
+        "status": "ok",
+        "service": "arize-tv-scheduler",
+        "version": APP_VERSION,
+        "timestamp": server_time_iso(),
+        "auth_enabled": bool(settings.api_key),
+        "database": {
+            "path": settings.database_path,
+            "total_entries": schedule_count,
+            "live_cards": live_count,
+            "templates": template_count,
+        },
+        "fallback": {
+            "cache_files": cache_file_count,
+            "json_backup_exists": backup_path.exists(),
+            "json_backup_size": backup_path.stat().st_size if backup_path.exists() else 0,
+        },
+        "scheduler": {
+            "running": scheduler_running,
+            "next_swap_at": next_swap.isoformat(),
+            "swap_time": f"{settings.swap_hour:02d}:{settings.swap_minute:02d}",
+            "timezone": settings.timezone,
+        },
+        "today": str(get_today()),
+    }
@@ -1,12 +1,21 @@
 """SQLite database setup and connection management."""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import aiosqlite
-from pathlib import Path
+from fastapi import Request
+
 from src.config import settings
 
 DATABASE_PATH = settings.database_path
 
-SCHEMA_SQL = """
+# Current time as integer unix milliseconds. Timestamps are stored this way
+# (fixed-width integer compares/sorts instead of ISO-8601 text); written out
+# because unixepoch('subsec') needs SQLite 3.42+.
+NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+SCHEMA_SQL = f"""
 CREATE TABLE IF NOT EXISTS tv_schedule (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
     schedule_date   DATE NOT NULL,
@@ -17,25 +26,34 @@ CREATE TABLE IF NOT EXISTS tv_schedule (
     html_content    TEXT NOT NULL,
     html_hash       TEXT,
     status          TEXT DEFAULT 'scheduled' CHECK(status IN ('scheduled', 'live', 'archived', 'overridden')),
-    created_at      DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at      DATETIME DEFAULT CURRENT_TIMESTAMP,
+    created_at      INTEGER DEFAULT ({NOW_MS}),
+    updated_at      INTEGER DEFAULT ({NOW_MS}),
     pushed_by       TEXT,
     UNIQUE(schedule_date, board_type)
 );
 
-CREATE INDEX IF NOT EXISTS idx_schedule_date ON tv_schedule(schedule_date);
-CREATE INDEX IF NOT EXISTS idx_schedule_status ON tv_schedule(status);
+-- UNIQUE(schedule_date, board_type) and the covering index below already
+-- lead with schedule_date, so the single-column indexes are redundant.
+DROP INDEX IF EXISTS idx_schedule_date;
+DROP INDEX IF EXISTS idx_schedule_status;
+CREATE INDEX IF NOT EXISTS idx_sched_status_date ON tv_schedule(status, schedule_date);
+CREATE INDEX IF NOT EXISTS idx_schedule_live
+    ON tv_schedule(schedule_date, board_type, status) WHERE status = 'live';
+CREATE INDEX IF NOT EXISTS idx_schedule_date_board_cover
+    ON tv_schedule(schedule_date, board_type, status, version, html_hash);
 
 CREATE TABLE IF NOT EXISTS tv_audit_log (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
     action          TEXT NOT NULL,
     schedule_date   DATE,
     board_type      TEXT,
-    details         TEXT,
-    timestamp       DATETIME DEFAULT CURRENT_TIMESTAMP
+    details         BLOB,
+    timestamp       INTEGER DEFAULT ({NOW_MS})
 );
 
-CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON tv_audit_log(timestamp);
+DROP INDEX IF EXISTS idx_audit_timestamp;
+CREATE INDEX IF NOT EXISTS idx_audit_ts_id ON tv_audit_log(timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_action_ts ON tv_audit_log(action, timestamp DESC, id DESC);
 
 CREATE TABLE IF NOT EXISTS card_templates (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -43,34 +61,118 @@ CREATE TABLE IF NOT EXISTS card_templates (
     board_type      TEXT NOT NULL CHECK(board_type IN ('mainboard', 'modboard')),
     version         TEXT CHECK(version IN ('rx', 'scaled', 'mod')),
     html_content    TEXT NOT NULL,
-    created_at      DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at      DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at      INTEGER DEFAULT ({NOW_MS}),
+    updated_at      INTEGER DEFAULT ({NOW_MS})
 );
 
 CREATE INDEX IF NOT EXISTS idx_template_board ON card_templates(board_type);
 """
 
 
-async def get_db() -> aiosqlite.Connection:
-    """Get an async database connection."""
+# journal_mode=WAL is stored in the database file, so init_db sets it once.
+# These are per-connection and run once when the shared connection opens.
+CONNECTION_PRAGMAS = """
+PRAGMA foreign_keys=ON;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-64000;
+PRAGMA wal_autocheckpoint=1000;
+"""
+
+# Read-only connections for endpoints that never write. Under WAL they read
+# concurrently with each other and with the writer on the shared connection.
+READ_POOL_SIZE = 4
+
+# SQLite serializes writers anyway; this keeps one coroutine's transaction
+# from being committed (or interleaved) by another on the shared connection.
+write_lock = asyncio.Lock()
+
+
+async def connect() -> aiosqlite.Connection:
+    """Open a new, fully configured database connection."""
     db = await aiosqlite.connect(DATABASE_PATH)
     db.row_factory = aiosqlite.Row
-    await db.execute("PRAGMA journal_mode=WAL")
-    await db.execute("PRAGMA foreign_keys=ON")
+    await db.executescript(CONNECTION_PRAGMAS)
     return db
 
 
+async def get_db(request: Request) -> aiosqlite.Connection:
+    """FastAPI dependency — the shared connection opened in the app lifespan."""
+    return request.app.state.db
+
+
+async def open_read_pool(size: int = READ_POOL_SIZE) -> asyncio.Queue:
+    """Open ``size`` read-only connections, handed out through a queue."""
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(size):
+        db = await connect()
+        await db.execute("PRAGMA query_only=ON")
+        pool.put_nowait(db)
+    return pool
+
+
+async def close_read_pool(pool: asyncio.Queue):
+    """Close every connection currently in the pool."""
+    while not pool.empty():
+        await pool.get_nowait().close()
+
+
+async def get_read_db(request: Request):
+    """FastAPI dependency — borrow a read-only connection from the pool."""
+    pool = request.app.state.read_pool
+    db = await pool.get()
+    try:
+        yield db
+    finally:
+        pool.put_nowait(db)
+
+
+@asynccontextmanager
+async def write_transaction(db: aiosqlite.Connection):
+    """Serialize a write path on the shared connection.
+
+    Rolls back on error so a failed writer never leaves a half-open
+    transaction behind for the next one to commit.
+    """
+    async with write_lock:
+        try:
+            yield db
+        except BaseException:
+            await db.rollback()
+            raise
+
+
+# Columns that held DATETIME text before timestamps moved to unix-ms
+TIMESTAMP_COLUMNS = {
+    "tv_schedule": ("created_at", "updated_at"),
+    "tv_audit_log": ("timestamp",),
+    "card_templates": ("created_at", "updated_at"),
+}
+
+
 async def init_db():
     """Initialize database schema."""
-    db = await get_db()
+    db = await connect()
     try:
+        # The PRAGMA returns a row; close its cursor, or the open statement
+        # makes the DROP INDEXes in SCHEMA_SQL fail with "table is locked".
+        await (await db.execute("PRAGMA journal_mode=WAL")).close()
         await db.executescript(SCHEMA_SQL)
+        # Convert rows written by older versions (CURRENT_TIMESTAMP text)
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            for column in columns:
+                await db.execute(
+                    f"""UPDATE {table}
+                        SET {column} = CAST((julianday({column}) - 2440587.5) * 86400000 AS INTEGER)
+                        WHERE typeof({column}) = 'text'"""
+                )
+        await db.execute("ANALYZE")  # refresh planner stats for the indexes
         await db.commit()
     finally:
         await db.close()
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(init_db())
     print(f"Database initialized at {DATABASE_PATH}")
\ No newline at end of file
@@ -1,8 +1,45 @@
-"""Pydantic models for request/response validation."""
+"""Pydantic models for request/response validation.
+
+Response models document the API in OpenAPI only (via ``responses=``);
+routes return plain dicts so output is serialized without re-validation.
+"""
 
 from datetime import date, datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, Field
+
+
+# ── Field Types ──────────────────────────────────────────────────
+
+BOARD_TYPES = frozenset({"mainboard", "modboard"})
+VERSIONS = frozenset({"rx", "scaled", "mod"})
+
+
+def _check_board_type(value: str) -> str:
+    if value not in BOARD_TYPES:
+        raise ValueError("board_type must be 'mainboard' or 'modboard'")
+    return value
+
+
+def _check_version(value: str) -> str:
+    if value not in VERSIONS:
+        raise ValueError("version must be 'rx', 'scaled' or 'mod'")
+    return value
+
+
+# Set membership instead of a regex match on every validated field
+BoardType = Annotated[str, AfterValidator(_check_board_type)]
+Version = Annotated[str, AfterValidator(_check_version)]
+# Largest file the dashboard uploader accepts (UPLOAD_MAX_SIZE in dashboard.js).
+# Images are inlined as base64 data URIs (4 chars per 3 bytes) inside a small
+# HTML shell, so the card text limit is the encoded size plus headroom.
+UPLOAD_MAX_BYTES = 5 * 1024 * 1024
+HTML_MAX_CHARS = 4 * -(-UPLOAD_MAX_BYTES // 3) + 64 * 1024
+
+# Card HTML: length-bounded only, no pattern checks over the (large) body
+HtmlStr = Annotated[str, Field(min_length=1, max_length=HTML_MAX_CHARS)]
+# Timestamps are stored and returned as integer unix milliseconds (UTC)
+Timestamp = Annotated[int, Field(description="Unix epoch milliseconds (UTC)")]
 
 
 # ── Schedule Models ──────────────────────────────────────────────
@@ -10,11 +47,11 @@ from pydantic import BaseModel, Field
 class ScheduleEntry(BaseModel):
     """A single card scheduled for a specific date and board."""
     schedule_date: date
-    board_type: str = Field(..., pattern="^(mainboard|modboard)$")
+    board_type: BoardType
     workout_title: str
     workout_date_label: Optional[str] = None
-    version: Optional[str] = Field(None, pattern="^(rx|scaled|mod)$")
-    html_content: str
+    version: Optional[Version] = None
+    html_content: HtmlStr
     pushed_by: Optional[str] = None
 
 
@@ -33,8 +70,8 @@ class ScheduleEntryResponse(BaseModel):
     version: Optional[str]
     html_hash: Optional[str]
     status: str
-    created_at: datetime
-    updated_at: datetime
+    created_at: Timestamp
+    updated_at: Timestamp
     pushed_by: Optional[str]
 
 
@@ -47,19 +84,19 @@ class ScheduleDateResponse(BaseModel):
 
 class ScheduleEditRequest(BaseModel):
     """Request to edit a scheduled card."""
-    html_content: Optional[str] = None
+    html_content: Optional[HtmlStr] = None
     workout_title: Optional[str] = None
-    version: Optional[str] = Field(None, pattern="^(rx|scaled|mod)$")
+    version: Optional[Version] = None
 
 
 # ── Override Models ──────────────────────────────────────────────
 
 class OverrideRequest(BaseModel):
     """Emergency override — instant card swap."""
-    board_type: str = Field(..., pattern="^(mainboard|modboard)$")
-    html_content: Optional[str] = None
+    board_type: BoardType
+    html_content: Optional[HtmlStr] = None
     source_date: Optional[date] = None
-    version: Optional[str] = Field(None, pattern="^(rx|scaled|mod)$")
+    version: Optional[Version] = None
     reason: Optional[str] = None
 
 
@@ -86,9 +123,9 @@ class TVHealthCheck(BaseModel):
 class TemplateCreateRequest(BaseModel):
     """Request to create a reusable card template."""
     name: str
-    board_type: str = Field(..., pattern="^(mainboard|modboard)$")
-    version: Optional[str] = Field(None, pattern="^(rx|scaled|mod)$")
-    html_content: str
+    board_type: BoardType
+    version: Optional[Version] = None
+    html_content: HtmlStr
 
 
 class TemplateResponse(BaseModel):
@@ -98,8 +135,8 @@ class TemplateResponse(BaseModel):
     board_type: str
     version: Optional[str]
     html_content: str
-    created_at: datetime
-    updated_at: datetime
+    created_at: Timestamp
+    updated_at: Timestamp
 
 
 # ── Clone Models ─────────────────────────────────────────────────
@@ -108,7 +145,7 @@ class CloneDayRequest(BaseModel):
     """Clone cards from one date to another."""
     source_date: date
     target_date: date
-    board_type: Optional[str] = Field(None, pattern="^(mainboard|modboard)$")
+    board_type: Optional[BoardType] = None
 
 
 class CloneWeekRequest(BaseModel):
@@ -126,12 +163,12 @@ class AuditLogEntry(BaseModel):
     schedule_date: Optional[date]
     board_type: Optional[str]
     details: Optional[str]
-    timestamp: datetime
+    timestamp: Timestamp
 
 
 class AuditLogResponse(BaseModel):
-    """Paginated audit log."""
+    """Keyset-paginated audit log; pass next_cursor back as ?cursor= for the next page."""
     entries: list[AuditLogEntry]
-    total: int
-    page: int
-    page_size: int
\ No newline at end of file
+    page_size: int
+    next_cursor: Optional[str]
+    has_more: bool
\ No newline at end of file
@@ -1,138 +1,179 @@
 """Schedule management API endpoints."""
 
-from datetime import date
+from datetime import date, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import aiosqlite
+from pydantic import ValidationError
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import Response
 
-from src.models.database import get_db
+from src.config import settings
+from src.models.database import get_db, get_read_db, write_transaction
 from src.models.schemas import (
+    BOARD_TYPES,
+    ScheduleEntry,
     SchedulePushRequest,
     ScheduleEditRequest,
     OverrideRequest,
     CloneDayRequest,
     CloneWeekRequest,
+    ScheduleDateResponse,
     TVStatusResponse,
     AuditLogResponse,
 )
 from src.services.scheduler import (
-    upsert_schedule_entry,
+    upsert_schedule_entries,
     get_schedule_for_date,
+    get_schedule_for_dates,
     get_schedule_range,
     edit_schedule_entry,
     delete_schedule_date,
     apply_override,
 )
 from src.services.audit import get_audit_log
+from src.services.fallback import resolve_card_html
 from src.services.auth import require_api_key
-from src.services.swap import get_today, get_next_swap_time
+from src.services.swap import get_today, get_next_swap_time, server_time_iso
 
 router = APIRouter(prefix="/api/schedule", tags=["schedule"])
 
+# push_schedule parses its own body, so describe it for OpenAPI by hand
+# (inlined: a model_json_schema() $defs ref would not resolve in the spec).
+_PUSH_BODY_SCHEMA = {
+    "title": "SchedulePushRequest",
+    "type": "object",
+    "required": ["entries"],
+    "properties": {
+        "entries": {"type": "array", "items": ScheduleEntry.model_json_schema()},
+    },
+}
+
+
+@router.post(
+    "",
+    dependencies=[Depends(require_api_key)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _PUSH_BODY_SCHEMA}},
+        },
+    },
+)
+async def push_schedule(
+    raw: Request,
+    db: aiosqlite.Connection = Depends(get_db),
+):
+    """Push approved cards to the schedule (1-31 days).
 
-@router.post("", dependencies=[Depends(require_api_key)])
-async def push_schedule(request: SchedulePushRequest):
-    """Push approved cards to the schedule (1-31 days)."""
-    db = await get_db()
+    The body is validated straight from bytes by pydantic-core instead of
+    json.loads followed by model validation, so large html_content payloads
+    are parsed once.
+    """
     try:
-        results = []
-        for entry in request.entries:
-            row_id = await upsert_schedule_entry(
-                db,
-                schedule_date=entry.schedule_date,
-                board_type=entry.board_type,
-                workout_title=entry.workout_title,
-                html_content=entry.html_content,
-                version=entry.version,
-                workout_date_label=entry.workout_date_label,
-                pushed_by=entry.pushed_by,
-            )
-            results.append({"id": row_id, "date": str(entry.schedule_date), "board": entry.board_type})
+        request = SchedulePushRequest.model_validate_json(await raw.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+    async with write_transaction(db):
+        row_ids = await upsert_schedule_entries(
+            db, [entry.model_dump() for entry in request.entries]
+        )
+        results = [
+            {"id": row_id, "date": str(entry.schedule_date), "board": entry.board_type}
+            for row_id, entry in zip(row_ids, request.entries)
+        ]
 
         return {"status": "ok", "scheduled": len(results), "entries": results}
-    finally:
-        await db.close()
 
 
 @router.get("")
 async def get_schedule(
     start: Optional[date] = Query(None),
     end: Optional[date] = Query(None),
-    page: int = Query(1, ge=1),
     page_size: int = Query(31, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: aiosqlite.Connection = Depends(get_read_db),
 ):
-    """Get the full schedule (paginated, optional date range)."""
-    db = await get_db()
+    """Get the full schedule (keyset-paginated, optional date range)."""
     try:
-        entries, total = await get_schedule_range(db, start, end, page, page_size)
-        return {"entries": entries, "total": total, "page": page, "page_size": page_size}
-    finally:
-        await db.close()
-
-
-@router.get("/status")
-async def get_live_status():
+        entries, next_cursor = await get_schedule_range(db, start, end, page_size, cursor)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    return {
+        "entries": entries,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+
+
+@router.get("/status", responses={200: {"model": TVStatusResponse}})
+async def get_live_status(
+    db: aiosqlite.Connection = Depends(get_read_db),
+    write_db: aiosqlite.Connection = Depends(get_db),
+):
     """Current live status — what's on each TV right now.
 
     Includes fallback_layer per board, next_swap_at, and server_time.
     """
-    from src.services.fallback import resolve_card_html
-    from src.config import settings
-    from datetime import datetime
+    today = get_today()
+    schedule = await get_schedule_for_date(db, today)
 
-    db = await get_db()
-    try:
-        today = get_today()
-        schedule = await get_schedule_for_date(db, today)
-
-        # Resolve fallback layer for each board
-        _, mainboard_layer = await resolve_card_html(db, today, settings.BOARD_MAINBOARD)
-        _, modboard_layer = await resolve_card_html(db, today, settings.BOARD_MODBOARD)
-
-        mainboard_data = schedule.get("mainboard")
-        modboard_data = schedule.get("modboard")
-
-        def enrich(card_data, layer):
-            if card_data:
-                card_data["fallback_layer"] = layer
-            else:
-                card_data = {"fallback_layer": layer, "status": "fallback"}
-            return card_data
-
-        return {
-            "mainboard": enrich(mainboard_data, mainboard_layer),
-            "modboard": enrich(modboard_data, modboard_layer),
-            "next_swap_at": get_next_swap_time().isoformat(),
-            "server_time": datetime.now().isoformat(),
-        }
-    finally:
-        await db.close()
-
-
-@router.get("/audit")
+    # Resolve fallback layer for each board
+    _, mainboard_layer, _ = await resolve_card_html(db, today, settings.BOARD_MAINBOARD, write_db)
+    _, modboard_layer, _ = await resolve_card_html(db, today, settings.BOARD_MODBOARD, write_db)
+
+    mainboard_data = schedule.get("mainboard")
+    modboard_data = schedule.get("modboard")
+
+    def enrich(card_data, layer):
+        if card_data:
+            card_data["fallback_layer"] = layer
+        else:
+            card_data = {"fallback_layer": layer, "status": "fallback"}
+        return card_data
+
+    return {
+        "mainboard": enrich(mainboard_data, mainboard_layer),
+        "modboard": enrich(modboard_data, modboard_layer),
+        "next_swap_at": get_next_swap_time().isoformat(),
+        "server_time": server_time_iso(),
+    }
+
+
+@router.get("/audit", responses={200: {"model": AuditLogResponse}})
 async def get_audit(
-    page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     action: Optional[str] = Query(None),
     board: Optional[str] = Query(None),
+    db: aiosqlite.Connection = Depends(get_read_db),
 ):
-    """Audit log of all schedule changes."""
-    db = await get_db()
+    """Audit log of all schedule changes, newest first."""
     try:
-        entries, total = await get_audit_log(db, page, page_size, action_filter=action, board_filter=board)
-        return {"entries": entries, "total": total, "page": page, "page_size": page_size}
-    finally:
-        await db.close()
-
-
-@router.get("/{target_date}")
-async def get_schedule_by_date(target_date: date):
+        entries, next_cursor = await get_audit_log(
+            db, page_size, cursor, action_filter=action, board_filter=board
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    return {
+        "entries": entries,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+
+
+@router.get("/{target_date}", responses={200: {"model": ScheduleDateResponse}})
+async def get_schedule_by_date(
+    target_date: date,
+    db: aiosqlite.Connection = Depends(get_read_db),
+):
     """Get cards scheduled for a specific date."""
-    db = await get_db()
-    try:
-        return await get_schedule_for_date(db, target_date)
-    finally:
-        await db.close()
+    return await get_schedule_for_date(db, target_date)
 
 
 @router.put("/{target_date}/{board_type}", dependencies=[Depends(require_api_key)])
@@ -140,17 +181,17 @@ async def edit_scheduled_card(
     target_date: date,
     board_type: str,
     request: ScheduleEditRequest,
+    db: aiosqlite.Connection = Depends(get_db),
 ):
     """Edit a future scheduled card."""
-    if board_type not in ("mainboard", "modboard"):
+    if board_type not in BOARD_TYPES:
         raise HTTPException(400, "board_type must be 'mainboard' or 'modboard'")
 
     today = get_today()
     if target_date < today:
         raise HTTPException(400, "Cannot edit past schedule entries")
 
-    db = await get_db()
-    try:
+    async with write_transaction(db):
         result = await edit_schedule_entry(
             db, target_date, board_type,
             html_content=request.html_content,
@@ -160,97 +201,101 @@ async def edit_scheduled_card(
         if not result:
             raise HTTPException(404, f"No entry for {target_date} / {board_type}")
         return result
-    finally:
-        await db.close()
 
 
 @router.delete("/{target_date}", dependencies=[Depends(require_api_key)])
-async def delete_scheduled_date(target_date: date):
+async def delete_scheduled_date(
+    target_date: date,
+    db: aiosqlite.Connection = Depends(get_db),
+):
     """Remove a scheduled day."""
     today = get_today()
     if target_date < today:
         raise HTTPException(400, "Cannot delete past schedule entries")
 
-    db = await get_db()
-    try:
+    async with write_transaction(db):
         count = await delete_schedule_date(db, target_date)
         if count == 0:
             raise HTTPException(404, f"No entries for {target_date}")
         return {"status": "ok", "deleted": count, "date": str(target_date)}
-    finally:
-        await db.close()
+
+
+def _clone_of(card: dict, target_date: date, pushed_by: str) -> dict:
+    """Build upsert kwargs copying an existing card onto target_date."""
+    return {
+        "schedule_date": target_date,
+        "board_type": card["board_type"],
+        "workout_title": card["workout_title"],
+        "html_content": card["html_content"],
+        "html_hash": card.get("html_hash"),
+        "version": card.get("version"),
+        "workout_date_label": card.get("workout_date_label"),
+        "pushed_by": pushed_by,
+    }
 
 
 @router.post("/clone", dependencies=[Depends(require_api_key)])
-async def clone_day(request: CloneDayRequest):
+async def clone_day(
+    request: CloneDayRequest,
+    db: aiosqlite.Connection = Depends(get_db),
+):
     """Clone cards from one date to another."""
-    from src.services.swap import get_today
     today = get_today()
     if request.target_date < today:
         raise HTTPException(400, "Cannot clone to a past date")
 
-    db = await get_db()
-    try:
+    async with write_transaction(db):
         source = await get_schedule_for_date(db, request.source_date)
         boards = [request.board_type] if request.board_type else ["mainboard", "modboard"]
-        cloned = []
-        for board in boards:
-            card = source.get(board)
-            if card:
-                row_id = await upsert_schedule_entry(
-                    db,
-                    schedule_date=request.target_date,
-                    board_type=board,
-                    workout_title=card["workout_title"],
-                    html_content=card["html_content"],
-                    version=card.get("version"),
-                    workout_date_label=card.get("workout_date_label"),
-                    pushed_by="clone",
-                )
-                cloned.append({"id": row_id, "board": board})
+        clones = [
+            _clone_of(source[board], request.target_date, "clone")
+            for board in boards if source.get(board)
+        ]
+        row_ids = await upsert_schedule_entries(db, clones)
+        cloned = [
+            {"id": row_id, "board": clone["board_type"]}
+            for row_id, clone in zip(row_ids, clones)
+        ]
 
         if not cloned:
             raise HTTPException(404, f"No cards found on {request.source_date} to clone")
         return {"status": "ok", "cloned": len(cloned), "entries": cloned}
-    finally:
-        await db.close()
 
 
 @router.post("/clone-week", dependencies=[Depends(require_api_key)])
-async def clone_week(request: CloneWeekRequest):
+async def clone_week(
+    request: CloneWeekRequest,
+    db: aiosqlite.Connection = Depends(get_db),
+):
     """Clone an entire week of cards to another week."""
-    from datetime import timedelta
     today = get_today()
     if request.target_week_start < today:
         raise HTTPException(400, "Cannot clone to a past week")
 
-    db = await get_db()
-    try:
-        cloned = []
-        for day_offset in range(7):
-            source_date = request.source_week_start + timedelta(days=day_offset)
+    async with write_transaction(db):
+        source_dates = [
+            request.source_week_start + timedelta(days=day_offset)
+            for day_offset in range(7)
+        ]
+        week = await get_schedule_for_dates(db, source_dates)
+
+        clones = []
+        for day_offset, source_date in enumerate(source_dates):
             target_date = request.target_week_start + timedelta(days=day_offset)
-            source = await get_schedule_for_date(db, source_date)
             for board in ["mainboard", "modboard"]:
-                card = source.get(board)
+                card = week[source_date].get(board)
                 if card:
-                    row_id = await upsert_schedule_entry(
-                        db,
-                        schedule_date=target_date,
-                        board_type=board,
-                        workout_title=card["workout_title"],
-                        html_content=card["html_content"],
-                        version=card.get("version"),
-                        workout_date_label=card.get("workout_date_label"),
-                        pushed_by="clone_week",
-                    )
-                    cloned.append({"id": row_id, "date": str(target_date), "board": board})
+                    clones.append(_clone_of(card, target_date, "clone_week"))
+
+        row_ids = await upsert_schedule_entries(db, clones)
+        cloned = [
+            {"id": row_id, "date": str(clone["schedule_date"]), "board": clone["board_type"]}
+            for row_id, clone in zip(row_ids, clones)
+        ]
 
         if not cloned:
             raise HTTPException(404, "No cards found in source week to clone")
         return {"status": "ok", "cloned": len(cloned), "entries": cloned}
-    finally:
-        await db.close()
 
 
 @router.get("/fetch-image")
@@ -276,20 +321,21 @@ async def fetch_image(url: str = Query(...)):
 
 
 @router.post("/override", dependencies=[Depends(require_api_key)])
-async def emergency_override(request: OverrideRequest):
+async def emergency_override(
+    request: OverrideRequest,
+    db: aiosqlite.Connection = Depends(get_db),
+):
     """Emergency override — instant card swap."""
-    db = await get_db()
-    try:
-        result = await apply_override(
-            db,
-            board_type=request.board_type,
-            html_content=request.html_content,
-            source_date=request.source_date,
-            version=request.version,
-            reason=request.reason,
-        )
-        return result
-    except ValueError as e:
-        raise HTTPException(400, str(e))
-    finally:
-        await db.close()
+    async with write_transaction(db):
+        try:
+            result = await apply_override(
+                db,
+                board_type=request.board_type,
+                html_content=request.html_content,
+                source_date=request.source_date,
+                version=request.version,
+                reason=request.reason,
+            )
+            return result
+        except ValueError as e:
+            raise HTTPException(400, str(e))
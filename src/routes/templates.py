@@ -1,9 +1,10 @@
 """Card template API endpoints."""
 
 from typing import Optional
+import aiosqlite
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from src.models.database import get_db
+from src.models.database import get_db, get_read_db, write_transaction
 from src.models.schemas import TemplateCreateRequest
 from src.services.auth import require_api_key
 from src.services.templates import (
@@ -17,34 +18,34 @@ router = APIRouter(prefix="/api/templates", tags=["templates"])
 
 
 @router.get("")
-async def get_templates(board_type: Optional[str] = Query(None)):
+async def get_templates(
+    board_type: Optional[str] = Query(None),
+    db: aiosqlite.Connection = Depends(get_read_db),
+):
     """List all card templates."""
-    db = await get_db()
-    try:
-        templates = await list_templates(db, board_type)
-        return {"templates": templates}
-    finally:
-        await db.close()
+    templates = await list_templates(db, board_type)
+    return {"templates": templates}
 
 
 @router.get("/{template_id}")
-async def get_template_by_id(template_id: int):
+async def get_template_by_id(
+    template_id: int,
+    db: aiosqlite.Connection = Depends(get_read_db),
+):
     """Get a single card template."""
-    db = await get_db()
-    try:
-        template = await get_template(db, template_id)
-        if not template:
-            raise HTTPException(404, f"Template {template_id} not found")
-        return template
-    finally:
-        await db.close()
+    template = await get_template(db, template_id)
+    if not template:
+        raise HTTPException(404, f"Template {template_id} not found")
+    return template
 
 
 @router.post("", dependencies=[Depends(require_api_key)])
-async def save_template(request: TemplateCreateRequest):
+async def save_template(
+    request: TemplateCreateRequest,
+    db: aiosqlite.Connection = Depends(get_db),
+):
     """Create or update a card template."""
-    db = await get_db()
-    try:
+    async with write_transaction(db):
         row_id = await create_template(
             db,
             name=request.name,
@@ -53,18 +54,16 @@ async def save_template(request: TemplateCreateRequest):
             version=request.version,
         )
         return {"status": "ok", "id": row_id, "name": request.name}
-    finally:
-        await db.close()
 
 
 @router.delete("/{template_id}", dependencies=[Depends(require_api_key)])
-async def remove_template(template_id: int):
+async def remove_template(
+    template_id: int,
+    db: aiosqlite.Connection = Depends(get_db),
+):
     """Delete a card template."""
-    db = await get_db()
-    try:
+    async with write_transaction(db):
         deleted = await delete_template(db, template_id)
         if not deleted:
             raise HTTPException(404, f"Template {template_id} not found")
         return {"status": "ok", "deleted": template_id}
-    finally:
-        await db.close()
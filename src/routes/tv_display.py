@@ -1,13 +1,14 @@
 """TV Display endpoints — unauthenticated, served to Fire TV browsers."""
 
-from datetime import datetime
-from fastapi import APIRouter
+import aiosqlite
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import HTMLResponse, JSONResponse
 
 from src.config import settings
-from src.models.database import get_db
+from src.models.database import get_db, get_read_db
+from src.models.schemas import TVHealthCheck
 from src.services.fallback import resolve_card_html
-from src.services.swap import get_today
+from src.services.swap import get_today, server_time_iso
 
 router = APIRouter(prefix="/tv", tags=["tv-display"])
 
@@ -32,67 +33,105 @@ TV_WRAPPER = """<!DOCTYPE html>
 </html>"""
 
 
-def _wrap_card(html_content: str) -> str:
-    """Wrap card HTML in the auto-refreshing TV shell."""
-    refresh_sec = settings.tv_refresh_interval_seconds
-    return TV_WRAPPER.format(
-        refresh=refresh_sec,
-        refresh_ms=refresh_sec * 1000,
-        content=html_content,
-    )
+# The shell only varies by refresh interval, which is fixed at startup, so
+# render its two halves once and concatenate the card between them.
+_HEAD, _TAIL = TV_WRAPPER.split("{content}")
+_HEAD = _HEAD.format(
+    refresh=settings.tv_refresh_interval_seconds,
+    refresh_ms=settings.tv_refresh_interval_seconds * 1000,
+)
+_TAIL = _TAIL.format()
+
+# Current wrapped page per board, as {board_type: (html_hash, page)}. Cards
+# can run to megabytes, so each board keeps only the page it is showing, and
+# a hit compares the hash rather than the HTML.
+_wrapped: dict[str, tuple[str, str]] = {}
+
+
+def _wrap_card(board_type: str, html_hash: str, html_content: str) -> str:
+    """Wrap card HTML in the auto-refreshing TV shell, memoised per board."""
+    cached = _wrapped.get(board_type)
+    if cached is not None and cached[0] == html_hash:
+        return cached[1]
+    page = _HEAD + html_content + _TAIL
+    _wrapped[board_type] = (html_hash, page)
+    return page
+
+
+def _etag(html_hash: str) -> str:
+    """Weak ETag for a wrapped card; the refresh interval is part of the shell.
+
+    Weak because GZipMiddleware may compress the body without touching the
+    header, so the same tag can cover more than one byte sequence.
+    """
+    return f'W/"{html_hash}-{settings.tv_refresh_interval_seconds}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names this ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates or "*" in candidates
+
+
+async def _serve_card(
+    request: Request,
+    db: aiosqlite.Connection,
+    write_db: aiosqlite.Connection,
+    board_type: str,
+) -> Response:
+    """Resolve today's card for a board, answering 304 if the TV already has it."""
+    today = get_today()
+    html, layer, html_hash = await resolve_card_html(db, today, board_type, write_db)
+    headers = {"ETag": _etag(html_hash), "Cache-Control": "no-cache"}
+    if _not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(_wrap_card(board_type, html_hash, html), headers=headers)
 
 
 @router.get("/mainboard", response_class=HTMLResponse)
-async def tv_mainboard():
+async def tv_mainboard(
+    request: Request,
+    db: aiosqlite.Connection = Depends(get_read_db),
+    write_db: aiosqlite.Connection = Depends(get_db),
+):
     """Serve today's main board card full-screen.
 
     TV1 (MAINBOARD_FRONT) and TV3 (MAINBOARD_BACK) point here.
     Falls through 4-layer fallback chain if no card found.
     """
-    db = await get_db()
-    try:
-        today = get_today()
-        html, layer = await resolve_card_html(db, today, settings.BOARD_MAINBOARD)
-        return HTMLResponse(_wrap_card(html))
-    finally:
-        await db.close()
+    return await _serve_card(request, db, write_db, settings.BOARD_MAINBOARD)
 
 
 @router.get("/modboard", response_class=HTMLResponse)
-async def tv_modboard():
+async def tv_modboard(
+    request: Request,
+    db: aiosqlite.Connection = Depends(get_read_db),
+    write_db: aiosqlite.Connection = Depends(get_db),
+):
     """Serve today's mod board card full-screen.
 
     TV2 (MODBOARD_FRONT) points here.
     Falls through 4-layer fallback chain if no card found.
     """
-    db = await get_db()
-    try:
-        today = get_today()
-        html, layer = await resolve_card_html(db, today, settings.BOARD_MODBOARD)
-        return HTMLResponse(_wrap_card(html))
-    finally:
-        await db.close()
+    return await _serve_card(request, db, write_db, settings.BOARD_MODBOARD)
 
 
-@router.get("/status")
-async def tv_health_check():
+@router.get("/status", responses={200: {"model": TVHealthCheck}})
+async def tv_health_check(db: aiosqlite.Connection = Depends(get_read_db)):
     """JSON health check — TVs can ping to confirm connectivity."""
-    db = await get_db()
-    try:
-        today = get_today()
-        main = await db.execute(
-            "SELECT 1 FROM tv_schedule WHERE schedule_date = ? AND board_type = ?",
-            (str(today), "mainboard"),
-        )
-        mod = await db.execute(
-            "SELECT 1 FROM tv_schedule WHERE schedule_date = ? AND board_type = ?",
-            (str(today), "modboard"),
-        )
-        return {
-            "status": "ok",
-            "server_time": datetime.now().isoformat(),
-            "mainboard_scheduled": (await main.fetchone()) is not None,
-            "modboard_scheduled": (await mod.fetchone()) is not None,
-        }
-    finally:
-        await db.close()
+    today = get_today()
+    cursor = await db.execute(
+        """SELECT board_type FROM tv_schedule
+           WHERE schedule_date = ? AND board_type IN (?, ?)""",
+        (str(today), settings.BOARD_MAINBOARD, settings.BOARD_MODBOARD),
+    )
+    boards = {row["board_type"] for row in await cursor.fetchall()}
+    return {
+        "status": "ok",
+        "server_time": server_time_iso(),
+        "mainboard_scheduled": settings.BOARD_MAINBOARD in boards,
+        "modboard_scheduled": settings.BOARD_MODBOARD in boards,
+    }
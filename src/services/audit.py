@@ -3,8 +3,23 @@
 from datetime import date, datetime
 from typing import Optional
 import json
+import sqlite3
 import aiosqlite
 
+from src.models.database import NOW_MS
+
+# Compact separators: details are read by machines and the dashboard, not diffed.
+_encode_details = json.JSONEncoder(separators=(",", ":")).encode
+
+# SQLite 3.45+ stores details as binary JSONB and renders it back to text
+# on read; older builds keep the compact JSON text as-is.
+HAS_JSONB = sqlite3.sqlite_version_info >= (3, 45, 0)
+_DETAILS_IN = "jsonb(?)" if HAS_JSONB else "?"
+_DETAILS_OUT = "json(details)" if HAS_JSONB else "details"
+
+INSERT_SQL = f"""INSERT INTO tv_audit_log (action, schedule_date, board_type, details, timestamp)
+   VALUES (?, ?, ?, {_DETAILS_IN}, {NOW_MS})"""
+
 
 async def log_action(
     db: aiosqlite.Connection,
@@ -13,24 +28,58 @@ async def log_action(
     board_type: Optional[str],
     details: Optional[dict] = None,
 ):
-    """Write an audit log entry."""
+    """Write an audit log entry.
+
+    Does not commit: the caller commits it together with the change it records.
+    """
     await db.execute(
-        """INSERT INTO tv_audit_log (action, schedule_date, board_type, details)
-           VALUES (?, ?, ?, ?)""",
+        INSERT_SQL,
         (action, str(schedule_date) if schedule_date else None,
-         board_type, json.dumps(details) if details else None),
+         board_type, _encode_details(details) if details else None),
     )
-    await db.commit()
+
+
+async def log_actions(
+    db: aiosqlite.Connection,
+    entries: list[tuple[str, Optional[date], Optional[str], Optional[dict]]],
+):
+    """Write many audit log entries with one statement.
+
+    Each entry is an (action, schedule_date, board_type, details) tuple.
+    Like log_action, this leaves the commit to the caller.
+    """
+    await db.executemany(
+        INSERT_SQL,
+        [
+            (action, str(schedule_date) if schedule_date else None,
+             board_type, _encode_details(details) if details else None)
+            for action, schedule_date, board_type, details in entries
+        ],
+    )
+
+
+def encode_audit_cursor(timestamp: int, row_id: int) -> str:
+    """Opaque keyset cursor pointing just past an audit row."""
+    return f"{timestamp}:{row_id}"
+
+
+def decode_audit_cursor(cursor: str) -> tuple[int, int]:
+    """Inverse of encode_audit_cursor. Raises ValueError on a malformed cursor."""
+    timestamp, _, row_id = cursor.partition(":")
+    return int(timestamp), int(row_id)
 
 
 async def get_audit_log(
     db: aiosqlite.Connection,
-    page: int = 1,
     page_size: int = 50,
+    cursor: Optional[str] = None,
     action_filter: Optional[str] = None,
     board_filter: Optional[str] = None,
-) -> tuple[list[dict], int]:
-    """Retrieve audit log entries with optional filtering and pagination."""
+) -> tuple[list[dict], Optional[str]]:
+    """Retrieve audit log entries, newest first, with keyset pagination.
+
+    Returns (entries, next_cursor); next_cursor is None on the last page.
+    """
     where_clauses: list[str] = []
     params: list = []
 
@@ -40,21 +89,23 @@ async def get_audit_log(
     if board_filter:
         where_clauses.append("board_type = ?")
         params.append(board_filter)
+    if cursor:
+        where_clauses.append("(timestamp, id) < (?, ?)")
+        params.extend(decode_audit_cursor(cursor))
 
     where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
-    # Total count
-    cursor = await db.execute(
-        f"SELECT COUNT(*) FROM tv_audit_log{where_sql}", params
-    )
-    total = (await cursor.fetchone())[0]
-
-    # Fetch page
-    offset = (page - 1) * page_size
-    cursor = await db.execute(
-        f"""SELECT * FROM tv_audit_log{where_sql}
-            ORDER BY timestamp DESC LIMIT ? OFFSET ?""",
-        params + [page_size, offset],
+    # Fetch one extra row to learn whether another page exists
+    rows = await db.execute_fetchall(
+        f"""SELECT id, action, schedule_date, board_type,
+                   {_DETAILS_OUT} AS details, timestamp
+            FROM tv_audit_log{where_sql}
+            ORDER BY timestamp DESC, id DESC LIMIT ?""",
+        params + [page_size + 1],
     )
-    rows = await cursor.fetchall()
-    return [dict(row) for row in rows], total
+    entries = [dict(row) for row in rows[:page_size]]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = entries[-1]
+        next_cursor = encode_audit_cursor(last["timestamp"], last["id"])
+    return entries, next_cursor
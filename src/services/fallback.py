@@ -6,49 +6,111 @@ Layer 3: Static HTML Cache (file-based)
 Layer 4: Branded Splash Screen (always available)
 """
 
+import asyncio
 import json
 import hashlib
+import os
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 import aiosqlite
 
 from src.config import settings
+from src.models.database import write_transaction
 from src.services.audit import log_action
 
 
 # ── Layer 2: JSON Snapshot ───────────────────────────────────────
 
-async def write_json_snapshot(db: aiosqlite.Connection):
-    """Write a JSON backup of all scheduled entries.
+SNAPSHOT_STATUSES = ("scheduled", "live")
 
-    Called on every DB write to keep Layer 2 in sync.
-    """
+# In-memory copy of the snapshot, {date: {"date": ..., board_type: {...}}}.
+# Built from the DB on first use, then patched per write.
+_snapshot: Optional[dict[str, dict]] = None
+
+# Reused compact encoder; the snapshot is machine-read, so no indent.
+_encode_snapshot = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _snapshot_card(schedule_date: str, board_type: str, title: str, version: Optional[str]) -> dict:
+    return {
+        "title": title,
+        "version": version,
+        "html_file": str(Path(settings.cache_dir) / f"{schedule_date}_{board_type}.html"),
+    }
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via a temp file + rename so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+async def _flush_json_snapshot():
+    """Serialize the in-memory snapshot and write it off the event loop."""
+    snapshot = {
+        "last_updated": datetime.now().isoformat(),
+        "entries": [_snapshot[d] for d in sorted(_snapshot)],
+    }
+    data = _encode_snapshot(snapshot).encode("utf-8")
+    await asyncio.to_thread(_atomic_write, Path(settings.backup_json_path), data)
+
+
+async def write_json_snapshot(db: aiosqlite.Connection):
+    """Rebuild the JSON backup of all scheduled entries from the DB."""
+    global _snapshot
     cursor = await db.execute(
-        """SELECT schedule_date, board_type, workout_title, version, html_content
-           FROM tv_schedule WHERE status IN ('scheduled', 'live')
-           ORDER BY schedule_date"""
+        """SELECT schedule_date, board_type, workout_title, version
+           FROM tv_schedule WHERE status IN ('scheduled', 'live')"""
     )
     rows = await cursor.fetchall()
 
     # Group by date
-    by_date: dict[str, dict] = {}
+    _snapshot = {}
     for row in rows:
         d = row["schedule_date"]
-        if d not in by_date:
-            by_date[d] = {"date": d}
-        by_date[d][row["board_type"]] = {
-            "title": row["workout_title"],
-            "version": row["version"],
-            "html_file": f"cache/{d}_{row['board_type']}.html",
-        }
+        _snapshot.setdefault(d, {"date": d})[row["board_type"]] = _snapshot_card(
+            d, row["board_type"], row["workout_title"], row["version"]
+        )
 
-    snapshot = {
-        "last_updated": datetime.now().isoformat(),
-        "entries": list(by_date.values()),
-    }
+    await _flush_json_snapshot()
 
-    Path(settings.backup_json_path).write_text(json.dumps(snapshot, indent=2))
+
+async def update_json_snapshot(
+    db: aiosqlite.Connection,
+    rows: list[dict] = (),
+    removed_dates: list[date] = (),
+):
+    """Patch the JSON backup for just the rows that changed.
+
+    Called on every DB write to keep Layer 2 in sync. Each row needs
+    schedule_date, board_type, workout_title, version and status; rows
+    whose status is not snapshotted are dropped from it.
+    """
+    if _snapshot is None:
+        await write_json_snapshot(db)  # first write: build from the DB
+        return
+
+    _patch_snapshot(rows, removed_dates)
+    await _flush_json_snapshot()
+
+
+def _patch_snapshot(rows, removed_dates):
+    """Apply changed rows and removed dates to the in-memory snapshot."""
+    for row in rows:
+        d, board = str(row["schedule_date"]), row["board_type"]
+        if row["status"] in SNAPSHOT_STATUSES:
+            _snapshot.setdefault(d, {"date": d})[board] = _snapshot_card(
+                d, board, row["workout_title"], row["version"]
+            )
+        elif d in _snapshot:
+            _snapshot[d].pop(board, None)
+            if len(_snapshot[d]) == 1:  # only "date" left
+                del _snapshot[d]
+    for d in removed_dates:
+        _snapshot.pop(str(d), None)
 
 
 # ── Layer 3: Static HTML Cache ───────────────────────────────────
@@ -64,23 +126,102 @@ async def write_html_cache(
     """
     cache_dir = settings.cache_path
     filename = f"{schedule_date}_{board_type}.html"
-    (cache_dir / filename).write_text(html_content, encoding="utf-8")
+    await asyncio.to_thread(
+        (cache_dir / filename).write_text, html_content, encoding="utf-8"
+    )
 
 
 def read_html_cache(schedule_date: date, board_type: str) -> Optional[str]:
-    """Read a cached HTML file (Layer 3 fallback)."""
+    """Read a cached HTML file (Layer 3 fallback).
+
+    Blocking; async callers run it via asyncio.to_thread.
+    """
     cache_dir = settings.cache_path
     filename = f"{schedule_date}_{board_type}.html"
-    filepath = cache_dir / filename
-    if filepath.exists():
-        return filepath.read_text(encoding="utf-8")
-    return None
+    try:
+        return (cache_dir / filename).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+# ── Background Writer for Layers 2 + 3 ──────────────────────────
+
+_fallback_queue: Optional[asyncio.Queue] = None
+_fallback_task: Optional[asyncio.Task] = None
+
+
+async def sync_fallback_layers(
+    db: aiosqlite.Connection,
+    cards: list[tuple[date, str, str]] = (),
+    rows: list[dict] = (),
+    removed_dates: list[date] = (),
+):
+    """Bring Layers 2 and 3 up to date after a committed DB write.
+
+    cards are (schedule_date, board_type, html_content) for the HTML cache;
+    rows and removed_dates are as for update_json_snapshot. With the
+    background writer running this only enqueues; otherwise it writes inline.
+    """
+    if _fallback_queue is not None:
+        _fallback_queue.put_nowait((cards, rows, removed_dates))
+        return
+    for schedule_date, board_type, html_content in cards:
+        await write_html_cache(schedule_date, board_type, html_content)
+    if rows or removed_dates:
+        await update_json_snapshot(db, rows, removed_dates)
+
+
+async def _fallback_worker(queue: asyncio.Queue):
+    """Drain queued fallback writes, coalescing each burst into one pass."""
+    while True:
+        batch = [await queue.get()]
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            # Last write wins per card; the snapshot is patched in queue order
+            html: dict[tuple[str, str], str] = {}
+            for cards, rows, removed_dates in batch:
+                for schedule_date, board_type, html_content in cards:
+                    html[(str(schedule_date), board_type)] = html_content
+                _patch_snapshot(rows, removed_dates)
+            for (schedule_date, board_type), html_content in html.items():
+                await write_html_cache(schedule_date, board_type, html_content)
+            if any(rows or removed_dates for _, rows, removed_dates in batch):
+                await _flush_json_snapshot()
+        except Exception as e:
+            print(f"[FALLBACK] Background write failed: {e}")
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def start_fallback_worker(db: aiosqlite.Connection):
+    """Build the snapshot once, then hand later fallback writes to a worker."""
+    global _fallback_queue, _fallback_task
+    await write_json_snapshot(db)
+    _fallback_queue = asyncio.Queue()
+    _fallback_task = asyncio.create_task(_fallback_worker(_fallback_queue))
+
+
+async def stop_fallback_worker():
+    """Flush pending fallback writes and stop the worker."""
+    global _fallback_queue, _fallback_task
+    if _fallback_queue is None:
+        return
+    queue, _fallback_queue = _fallback_queue, None
+    await queue.join()
+    _fallback_task.cancel()
+    _fallback_task = None
 
 
 # ── Layer 4: Branded Splash Screen ──────────────────────────────
 
+@lru_cache(maxsize=1)
 def get_splash_html() -> str:
-    """Return the branded splash screen HTML (Layer 4 — last resort)."""
+    """Return the branded splash screen HTML (Layer 4 — last resort).
+
+    Static for the life of the process, so it is read from disk once.
+    """
     splash_path = Path(settings.splash_html)
     if splash_path.exists():
         return splash_path.read_text(encoding="utf-8")
@@ -105,69 +246,114 @@ def get_splash_html() -> str:
 </body></html>"""
 
 
+@lru_cache(maxsize=1)
+def get_splash_hash() -> str:
+    """Hash of the splash HTML, computed once alongside the cached page."""
+    return compute_html_hash(get_splash_html())
+
+
+def invalidate_splash_cache():
+    """Drop the cached splash HTML so the next call re-reads the file."""
+    get_splash_html.cache_clear()
+    get_splash_hash.cache_clear()
+
+
 # ── Fallback Chain Resolver ──────────────────────────────────────
 
+async def _log_fallback(
+    db: aiosqlite.Connection,
+    target_date: date,
+    board_type: str,
+    layer: int,
+    source: str,
+):
+    """Audit a fallback hit. Read paths run unlocked, so lock just this write."""
+    async with write_transaction(db):
+        await log_action(
+            db, "fallback_triggered",
+            target_date, board_type,
+            {"layer": layer, "source": source},
+        )
+        await db.commit()
+
+
+def _read_snapshot_html(target_date: date, board_type: str) -> Optional[str]:
+    """Look up a card's HTML through the JSON snapshot (blocking file I/O)."""
+    snapshot_path = Path(settings.backup_json_path)
+    if not snapshot_path.exists():
+        return None
+    snapshot = json.loads(snapshot_path.read_bytes())
+    for entry in snapshot.get("entries", []):
+        if entry.get("date") == str(target_date):
+            board_data = entry.get(board_type)
+            if board_data and board_data.get("html_file"):
+                html_file = Path(board_data["html_file"])
+                if html_file.exists():
+                    return html_file.read_text(encoding="utf-8")
+    return None
+
+
 async def resolve_card_html(
     db: aiosqlite.Connection,
     target_date: date,
     board_type: str,
-) -> tuple[str, int]:
+    write_db: aiosqlite.Connection,
+) -> tuple[str, int, str]:
     """Resolve the HTML to display, walking the 4-layer fallback chain.
 
-    Returns (html_content, layer_used).
+    ``db`` is a read-only pool connection, so Layer 1 never sees another
+    writer's uncommitted rows; fallback hits are audited on ``write_db``,
+    the shared writer.
+
+    Returns (html_content, layer_used, html_hash).
     Layer 1 = DB, 2 = JSON, 3 = file cache, 4 = splash.
     """
 
     # Layer 1: SQLite
     cursor = await db.execute(
-        """SELECT html_content FROM tv_schedule
+        """SELECT html_content, html_hash FROM tv_schedule
            WHERE schedule_date = ? AND board_type = ?
            AND status IN ('scheduled', 'live', 'overridden')""",
         (str(target_date), board_type),
     )
     row = await cursor.fetchone()
     if row:
-        return row["html_content"], 1
+        # Rows written before html_hash was populated have NULL there; the
+        # hash keys the TV page memo and ETag, so never hand back None.
+        html_hash = row["html_hash"] or compute_html_hash(row["html_content"])
+        return row["html_content"], 1, html_hash
 
     # Layer 2: JSON Snapshot
     try:
-        snapshot_path = Path(settings.backup_json_path)
-        if snapshot_path.exists():
-            snapshot = json.loads(snapshot_path.read_text())
-            for entry in snapshot.get("entries", []):
-                if entry.get("date") == str(target_date):
-                    board_data = entry.get(board_type)
-                    if board_data and board_data.get("html_file"):
-                        html_file = Path(board_data["html_file"])
-                        if html_file.exists():
-                            await log_action(
-                                db, "fallback_triggered",
-                                target_date, board_type,
-                                {"layer": 2, "source": "json_snapshot"},
-                            )
-                            return html_file.read_text(encoding="utf-8"), 2
+        html = await asyncio.to_thread(_read_snapshot_html, target_date, board_type)
     except Exception:
-        pass
+        html = None
+    if html:
+        await _log_fallback(write_db, target_date, board_type, 2, "json_snapshot")
+        return html, 2, compute_html_hash(html)
 
     # Layer 3: Static HTML Cache
-    cached = read_html_cache(target_date, board_type)
+    cached = await asyncio.to_thread(read_html_cache, target_date, board_type)
     if cached:
-        await log_action(
-            db, "fallback_triggered",
-            target_date, board_type,
-            {"layer": 3, "source": "html_cache"},
-        )
-        return cached, 3
+        await _log_fallback(write_db, target_date, board_type, 3, "html_cache")
+        return cached, 3, compute_html_hash(cached)
 
     # Layer 4: Branded Splash
-    await log_action(
-        db, "fallback_triggered",
-        target_date, board_type,
-        {"layer": 4, "source": "splash_screen"},
-    )
-    return get_splash_html(), 4
+    await _log_fallback(write_db, target_date, board_type, 4, "splash_screen")
+    return get_splash_html(), 4, get_splash_hash()
+
+
+def compute_html_hash(html_content: str | bytes) -> str:
+    """Compute SHA256 hash of HTML content for change detection.
+
+    Accepts already-encoded UTF-8 bytes to skip the encode copy. hashlib is
+    backed by OpenSSL, which uses the CPU's SHA extensions when present.
+    """
+    if isinstance(html_content, str):
+        html_content = html_content.encode("utf-8")
+    return compute_html_hash_bytes(html_content)
 
 
-def compute_html_hash(html_content: str) -> str:
-    """Compute SHA256 hash of HTML content for change detection."""
-    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+def compute_html_hash_bytes(html_bytes: bytes | memoryview) -> str:
+    """SHA256 of already-encoded HTML; buffers are hashed in place, without a copy."""
+    return hashlib.sha256(html_bytes).hexdigest()
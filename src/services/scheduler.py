@@ -1,17 +1,34 @@
 """Schedule CRUD and business logic."""
 
+import asyncio
 from datetime import date, datetime
 from typing import Optional
 import aiosqlite
 
-from src.services.audit import log_action
+from src.models.database import NOW_MS
+from src.services.audit import log_action, log_actions
 from src.services.fallback import (
     compute_html_hash,
-    write_html_cache,
-    write_json_snapshot,
+    sync_fallback_layers,
 )
 
 
+UPSERT_SQL = f"""INSERT INTO tv_schedule
+   (schedule_date, board_type, workout_title, workout_date_label,
+    version, html_content, html_hash, status, pushed_by, created_at, updated_at)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {NOW_MS}, {NOW_MS})
+   ON CONFLICT(schedule_date, board_type)
+   DO UPDATE SET
+     workout_title = excluded.workout_title,
+     workout_date_label = excluded.workout_date_label,
+     version = excluded.version,
+     html_content = excluded.html_content,
+     html_hash = excluded.html_hash,
+     status = excluded.status,
+     pushed_by = excluded.pushed_by,
+     updated_at = {NOW_MS}"""
+
+
 async def upsert_schedule_entry(
     db: aiosqlite.Connection,
     schedule_date: date,
@@ -21,47 +38,94 @@ async def upsert_schedule_entry(
     version: Optional[str] = None,
     workout_date_label: Optional[str] = None,
     pushed_by: Optional[str] = None,
+    status: str = "scheduled",
 ) -> int:
     """Insert or replace a schedule entry (UPSERT on date+board).
 
     Also writes to all fallback layers and logs the action.
     Returns the row ID.
     """
-    html_hash = compute_html_hash(html_content)
+    row_ids = await upsert_schedule_entries(db, [{
+        "schedule_date": schedule_date,
+        "board_type": board_type,
+        "workout_title": workout_title,
+        "html_content": html_content,
+        "version": version,
+        "workout_date_label": workout_date_label,
+        "pushed_by": pushed_by,
+        "status": status,
+    }])
+    return row_ids[0]
+
+
+async def upsert_schedule_entries(
+    db: aiosqlite.Connection,
+    entries: list[dict],
+) -> list[int]:
+    """Bulk UPSERT schedule entries in a single transaction.
+
+    Each entry is a dict of upsert_schedule_entry keyword arguments, plus an
+    optional precomputed ``html_hash`` (e.g. when copying an existing card)
+    and ``status`` (default ``'scheduled'``).
+    Rows and their audit entries share one commit; fallback layers are
+    written afterwards, with a single JSON snapshot for the whole batch.
+    Returns the row IDs in input order.
+    """
+    if not entries:
+        return []
+
+    # hashlib releases the GIL on large buffers, so hash the batch off-loop
+    hashes = await asyncio.to_thread(_hash_entries, entries)
+
+    await db.executemany(
+        UPSERT_SQL,
+        [
+            (
+                str(e["schedule_date"]), e["board_type"], e["workout_title"],
+                e.get("workout_date_label"), e.get("version"),
+                e["html_content"], html_hash, e.get("status", "scheduled"),
+                e.get("pushed_by"),
+            )
+            for e, html_hash in zip(entries, hashes)
+        ],
+    )
 
+    # executemany has no per-row lastrowid; look the IDs up in the same transaction
+    dates = sorted({str(e["schedule_date"]) for e in entries})
     cursor = await db.execute(
-        """INSERT INTO tv_schedule
-           (schedule_date, board_type, workout_title, workout_date_label,
-            version, html_content, html_hash, status, pushed_by, updated_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, 'scheduled', ?, CURRENT_TIMESTAMP)
-           ON CONFLICT(schedule_date, board_type)
-           DO UPDATE SET
-             workout_title = excluded.workout_title,
-             workout_date_label = excluded.workout_date_label,
-             version = excluded.version,
-             html_content = excluded.html_content,
-             html_hash = excluded.html_hash,
-             status = 'scheduled',
-             pushed_by = excluded.pushed_by,
-             updated_at = CURRENT_TIMESTAMP""",
-        (
-            str(schedule_date), board_type, workout_title,
-            workout_date_label, version, html_content, html_hash, pushed_by,
-        ),
+        f"""SELECT id, schedule_date, board_type FROM tv_schedule
+            WHERE schedule_date IN ({", ".join("?" * len(dates))})""",
+        dates,
     )
+    ids = {
+        (row["schedule_date"], row["board_type"]): row["id"]
+        for row in await cursor.fetchall()
+    }
+
+    # Audit
+    await log_actions(db, [
+        (
+            "schedule", e["schedule_date"], e["board_type"],
+            {"title": e["workout_title"], "version": e.get("version"),
+             "pushed_by": e.get("pushed_by")},
+        )
+        for e in entries
+    ])
     await db.commit()
 
     # Write to fallback layers
-    await write_html_cache(schedule_date, board_type, html_content)
-    await write_json_snapshot(db)
-
-    # Audit
-    await log_action(
-        db, "schedule", schedule_date, board_type,
-        {"title": workout_title, "version": version, "pushed_by": pushed_by},
+    await sync_fallback_layers(
+        db,
+        cards=[(e["schedule_date"], e["board_type"], e["html_content"]) for e in entries],
+        rows=[{**e, "status": e.get("status", "scheduled")} for e in entries],
     )
 
-    return cursor.lastrowid
+    return [ids[(str(e["schedule_date"]), e["board_type"])] for e in entries]
+
+
+def _hash_entries(entries: list[dict]) -> list[str]:
+    """HTML hashes for a batch, reusing any precomputed ``html_hash``."""
+    return [e.get("html_hash") or compute_html_hash(e["html_content"]) for e in entries]
 
 
 async def get_schedule_for_date(
@@ -82,14 +146,52 @@ async def get_schedule_for_date(
     return result
 
 
+async def get_schedule_for_dates(
+    db: aiosqlite.Connection,
+    target_dates: list[date],
+) -> dict[date, dict]:
+    """Get scheduled cards for several dates in one query.
+
+    Returns {date: {"date", "mainboard", "modboard"}} for every requested date.
+    """
+    result = {d: {"date": d, "mainboard": None, "modboard": None} for d in target_dates}
+    if not target_dates:
+        return result
+
+    by_str = {str(d): d for d in target_dates}
+    cursor = await db.execute(
+        f"""SELECT * FROM tv_schedule
+            WHERE schedule_date IN ({", ".join("?" * len(by_str))})""",
+        list(by_str),
+    )
+    for row in await cursor.fetchall():
+        result[by_str[row["schedule_date"]]][row["board_type"]] = dict(row)
+
+    return result
+
+
+def encode_schedule_cursor(schedule_date: str, board_type: str) -> str:
+    """Opaque keyset cursor pointing just past a schedule row."""
+    return f"{schedule_date}:{board_type}"
+
+
+def decode_schedule_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of encode_schedule_cursor. Raises ValueError on a malformed cursor."""
+    schedule_date, _, board_type = cursor.partition(":")
+    return str(date.fromisoformat(schedule_date)), board_type
+
+
 async def get_schedule_range(
     db: aiosqlite.Connection,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    page: int = 1,
     page_size: int = 31,
-) -> tuple[list[dict], int]:
-    """Get schedule entries with optional date range and pagination."""
+    cursor: Optional[str] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """Get schedule entries with optional date range and keyset pagination.
+
+    Returns (entries, next_cursor); next_cursor is None on the last page.
+    """
     where_clauses = []
     params = []
 
@@ -99,26 +201,26 @@ async def get_schedule_range(
     if end_date:
         where_clauses.append("schedule_date <= ?")
         params.append(str(end_date))
+    if cursor:
+        where_clauses.append("(schedule_date, board_type) > (?, ?)")
+        params.extend(decode_schedule_cursor(cursor))
 
     where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
-    # Total count
-    cursor = await db.execute(
-        f"SELECT COUNT(*) FROM tv_schedule{where_sql}", params
-    )
-    total = (await cursor.fetchone())[0]
-
-    # Fetch page
-    offset = (page - 1) * page_size
-    cursor = await db.execute(
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(
         f"""SELECT * FROM tv_schedule{where_sql}
             ORDER BY schedule_date ASC, board_type ASC
-            LIMIT ? OFFSET ?""",
-        params + [page_size, offset],
+            LIMIT ?""",
+        params + [page_size + 1],
     )
-    rows = await cursor.fetchall()
-
-    return [dict(row) for row in rows], total
+    entries = [dict(row) async for row in result]
+    next_cursor = None
+    if len(entries) > page_size:
+        del entries[page_size:]
+        last = entries[-1]
+        next_cursor = encode_schedule_cursor(last["schedule_date"], last["board_type"])
+    return entries, next_cursor
 
 
 async def edit_schedule_entry(
@@ -140,13 +242,15 @@ async def edit_schedule_entry(
     if not existing:
         return None
 
+    # Only touch fields whose value actually changes; unchanged HTML skips
+    # hashing, the cache write and the UPDATE of the large column.
     updates = {}
-    if html_content is not None:
+    if html_content is not None and html_content != existing["html_content"]:
         updates["html_content"] = html_content
         updates["html_hash"] = compute_html_hash(html_content)
-    if workout_title is not None:
+    if workout_title is not None and workout_title != existing["workout_title"]:
         updates["workout_title"] = workout_title
-    if version is not None:
+    if version is not None and version != existing["version"]:
         updates["version"] = version
 
     if not updates:
@@ -155,30 +259,28 @@ async def edit_schedule_entry(
     set_clause = ", ".join(f"{k} = ?" for k in updates)
     values = list(updates.values())
 
-    await db.execute(
-        f"""UPDATE tv_schedule SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-            WHERE schedule_date = ? AND board_type = ?""",
+    cursor = await db.execute(
+        f"""UPDATE tv_schedule SET {set_clause}, updated_at = {NOW_MS}
+            WHERE schedule_date = ? AND board_type = ?
+            RETURNING *""",
         values + [str(target_date), board_type],
     )
-    await db.commit()
-
-    # Update fallback layers
-    final_html = updates.get("html_content", existing["html_content"])
-    await write_html_cache(target_date, board_type, final_html)
-    await write_json_snapshot(db)
+    updated = dict(await cursor.fetchone())
 
     # Audit
     await log_action(
         db, "edit", target_date, board_type,
         {"changes": list(updates.keys())},
     )
+    await db.commit()
 
-    # Return updated
-    cursor = await db.execute(
-        "SELECT * FROM tv_schedule WHERE schedule_date = ? AND board_type = ?",
-        (str(target_date), board_type),
+    # Update fallback layers
+    await sync_fallback_layers(
+        db,
+        cards=[(target_date, board_type, html_content)] if "html_content" in updates else [],
+        rows=[updated] if "workout_title" in updates or "version" in updates else [],
     )
-    return dict(await cursor.fetchone())
+    return updated
 
 
 async def delete_schedule_date(
@@ -196,14 +298,13 @@ async def delete_schedule_date(
         "DELETE FROM tv_schedule WHERE schedule_date = ?",
         (str(target_date),),
     )
+
+    # Audit
+    await log_actions(db, [("delete", target_date, board, None) for board in boards])
     await db.commit()
 
     # Update JSON snapshot
-    await write_json_snapshot(db)
-
-    # Audit
-    for board in boards:
-        await log_action(db, "delete", target_date, board, {})
+    await sync_fallback_layers(db, removed_dates=[target_date])
 
     return len(boards)
 
@@ -242,31 +343,25 @@ async def apply_override(
 
     # Mark current as overridden
     await db.execute(
-        """UPDATE tv_schedule SET status = 'overridden', updated_at = CURRENT_TIMESTAMP
+        f"""UPDATE tv_schedule SET status = 'overridden', updated_at = {NOW_MS}
            WHERE schedule_date = ? AND board_type = ? AND status = 'live'""",
         (str(today), board_type),
     )
 
-    # Upsert override
+    # Audit
+    await log_action(
+        db, "override", today, board_type,
+        {"reason": reason, "source_date": str(source_date) if source_date else None},
+    )
+
+    # Upsert override; its commit also covers the UPDATE and audit row above
     row_id = await upsert_schedule_entry(
         db, today, board_type,
         workout_title="OVERRIDE",
         html_content=html_content,
         version=version,
         pushed_by="emergency_override",
-    )
-
-    # Set status to overridden
-    await db.execute(
-        "UPDATE tv_schedule SET status = 'overridden' WHERE id = ?",
-        (row_id,),
-    )
-    await db.commit()
-
-    # Audit
-    await log_action(
-        db, "override", today, board_type,
-        {"reason": reason, "source_date": str(source_date) if source_date else None},
+        status="overridden",
     )
 
     return {"id": row_id, "board_type": board_type, "date": str(today), "status": "overridden"}
@@ -1,24 +1,72 @@
 """Midnight card swap service — auto-rotates cards daily."""
 
-from datetime import date, datetime
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 import aiosqlite
 
 from src.config import settings
+from src.models.database import NOW_MS
 from src.services.audit import log_action
+from src.services.fallback import sync_fallback_layers
+
+# Resolved once; shared with the APScheduler trigger in main.py
+SCHEDULE_TZ = ZoneInfo(settings.timezone)
+
+
+_server_time_iso = datetime.now().isoformat()
+
+
+def server_time_iso() -> str:
+    """Server time as an ISO string, refreshed once a second by tick_server_time()."""
+    return _server_time_iso
+
+
+async def tick_server_time():
+    """Background task: refresh the cached server time string every second."""
+    global _server_time_iso
+    while True:
+        _server_time_iso = datetime.now().isoformat()
+        await asyncio.sleep(1)
+
+
+# (unix second, date) of the last get_today() lookup
+_today: tuple[int, Optional[date]] = (0, None)
 
 
 def get_today() -> date:
-    """Get today's date in the configured timezone."""
-    tz = ZoneInfo(settings.timezone)
-    return datetime.now(tz).date()
+    """Get today's date in the configured timezone.
+
+    Called on every TV request, so the lookup is reused within a second.
+    """
+    global _today
+    second = int(time.time())
+    if _today[0] != second:
+        _today = (second, datetime.now(SCHEDULE_TZ).date())
+    return _today[1]
+
+
+_next_swap: Optional[datetime] = None
 
 
 def get_next_swap_time() -> datetime:
-    """Calculate the next midnight swap time."""
-    tz = ZoneInfo(settings.timezone)
-    now = datetime.now(tz)
+    """Return the next midnight swap time.
+
+    The value only changes once the swap time passes, so it is cached
+    until then. Recomputing is idempotent, so no lock is needed.
+    """
+    global _next_swap
+    now = datetime.now(SCHEDULE_TZ)
+    if _next_swap is None or now >= _next_swap:
+        _next_swap = _compute_next_swap(now)
+    return _next_swap
+
+
+def _compute_next_swap(now: datetime) -> datetime:
+    """Calculate the next swap time after ``now``."""
     tomorrow = now.replace(
         hour=settings.swap_hour,
         minute=settings.swap_minute,
@@ -26,7 +74,6 @@ def get_next_swap_time() -> datetime:
         microsecond=0,
     )
     if tomorrow <= now:
-        from datetime import timedelta
         tomorrow += timedelta(days=1)
     return tomorrow
 
@@ -36,32 +83,36 @@ async def execute_midnight_swap(db: aiosqlite.Connection):
 
     1. Archive yesterday's cards (status → 'archived')
     2. Activate today's cards (status → 'live')
+    3. Drop the archived cards from the JSON snapshot
     """
     today = get_today()
-    from datetime import timedelta
     yesterday = today - timedelta(days=1)
 
     # Archive yesterday
-    await db.execute(
-        """UPDATE tv_schedule SET status = 'archived', updated_at = CURRENT_TIMESTAMP
-           WHERE schedule_date = ? AND status IN ('live', 'overridden')""",
+    cursor = await db.execute(
+        f"""UPDATE tv_schedule SET status = 'archived', updated_at = {NOW_MS}
+           WHERE schedule_date = ? AND status IN ('live', 'overridden')
+           RETURNING schedule_date, board_type, workout_title, version, status""",
         (str(yesterday),),
     )
+    archived = await cursor.fetchall()
 
     # Activate today
     cursor = await db.execute(
-        """UPDATE tv_schedule SET status = 'live', updated_at = CURRENT_TIMESTAMP
+        f"""UPDATE tv_schedule SET status = 'live', updated_at = {NOW_MS}
            WHERE schedule_date = ? AND status = 'scheduled'""",
         (str(today),),
     )
     activated = cursor.rowcount
 
-    await db.commit()
-
     # Audit
     await log_action(
         db, "swap", today, None,
         {"activated_count": activated, "from_date": str(yesterday)},
     )
+    await db.commit()
+
+    # Archived rows drop out of the JSON snapshot; 'scheduled' -> 'live' stays in
+    await sync_fallback_layers(db, rows=archived)
 
     return {"date": str(today), "activated": activated}
@@ -3,6 +3,8 @@
 from typing import Optional
 import aiosqlite
 
+from src.models.database import NOW_MS
+
 
 async def create_template(
     db: aiosqlite.Connection,
@@ -13,19 +15,42 @@ async def create_template(
 ) -> int:
     """Create or update a card template. Returns the row ID."""
     cursor = await db.execute(
-        """INSERT INTO card_templates (name, board_type, version, html_content, updated_at)
-           VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        f"""INSERT INTO card_templates
+             (name, board_type, version, html_content, created_at, updated_at)
+           VALUES (?, ?, ?, ?, {NOW_MS}, {NOW_MS})
            ON CONFLICT(name) DO UPDATE SET
              board_type = excluded.board_type,
              version = excluded.version,
              html_content = excluded.html_content,
-             updated_at = CURRENT_TIMESTAMP""",
+             updated_at = {NOW_MS}""",
         (name, board_type, version, html_content),
     )
     await db.commit()
     return cursor.lastrowid
 
 
+async def create_templates(
+    db: aiosqlite.Connection,
+    templates: list[tuple[str, str, str, Optional[str]]],
+):
+    """Bulk-create templates with one statement and one commit.
+
+    Each template is a (name, board_type, html_content, version) tuple.
+    """
+    await db.executemany(
+        f"""INSERT INTO card_templates
+             (name, board_type, version, html_content, created_at, updated_at)
+           VALUES (?, ?, ?, ?, {NOW_MS}, {NOW_MS})
+           ON CONFLICT(name) DO UPDATE SET
+             board_type = excluded.board_type,
+             version = excluded.version,
+             html_content = excluded.html_content,
+             updated_at = {NOW_MS}""",
+        [(name, board_type, version, html) for name, board_type, html, version in templates],
+    )
+    await db.commit()
+
+
 async def get_template(db: aiosqlite.Connection, template_id: int) -> Optional[dict]:
     """Get a template by ID."""
     cursor = await db.execute(
@@ -58,8 +83,8 @@ async def list_templates(
         cursor = await db.execute(
             "SELECT * FROM card_templates ORDER BY name"
         )
-    rows = await cursor.fetchall()
-    return [dict(row) for row in rows]
+    # Single pass: rows arrive in aiosqlite chunks instead of one full list
+    return [dict(row) async for row in cursor]
 
 
 async def delete_template(db: aiosqlite.Connection, template_id: int) -> bool:
@@ -0,0 +1,61 @@
+"""Shared fixtures for the ATC TV Scheduler tests."""
+
+import os
+import sqlite3
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.main import app
+from src.models import database
+from src.models.database import SCHEMA_SQL
+
+# Test-only: throwaway in-memory DBs need no journal, fsync or shared locks.
+# Never use these on the app's connections.
+TEST_PRAGMAS = """
+PRAGMA journal_mode=OFF;
+PRAGMA synchronous=OFF;
+PRAGMA locking_mode=EXCLUSIVE;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-2000;
+"""
+
+
+@pytest_asyncio.fixture(scope="session")
+async def schema_db():
+    """In-memory DB with the app schema, built once per session."""
+    db = await aiosqlite.connect(":memory:")
+    await db.executescript(SCHEMA_SQL)
+    yield db
+    await db.close()
+
+
+@pytest_asyncio.fixture
+async def db(schema_db):
+    """Fresh copy of the schema DB for one test, cloned via the backup API."""
+    conn = await aiosqlite.connect(":memory:")
+    conn.row_factory = sqlite3.Row  # the C row type; aiosqlite.Row is an alias
+    await conn.executescript(TEST_PRAGMAS)
+    await schema_db.backup(conn)
+    yield conn
+    await conn.close()
+
+
+@pytest.fixture(scope="session")
+def sample_templates() -> dict[str, os.DirEntry]:
+    """Directory entries for the sample cards, from one scandir per session."""
+    return {entry.name: entry for entry in os.scandir("src/static/samples")}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """TestClient over the full app, backed by a throwaway DB and cache dir."""
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "schedule.db"))
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "_cache_path", None)
+    monkeypatch.setattr(settings, "backup_json_path", str(tmp_path / "backup.json"))
+    with TestClient(app) as c:
+        yield c
@@ -1,90 +1,216 @@
 """Tests for ATC TV Scheduler."""
 
+import base64
+import inspect
+import json
+import mmap
+import os
 import pytest
-from datetime import date
-from pathlib import Path
+import sqlite3
+from datetime import date, timedelta
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.config import settings
+from src.models import database
+from src.models.schemas import (
+    UPLOAD_MAX_BYTES,
+    CloneDayRequest,
+    CloneWeekRequest,
+    ScheduleEntry,
+    ScheduleEntryResponse,  # noqa: F401  (import check)
+    SchedulePushRequest,
+    TemplateCreateRequest,
+)
+from src.services.audit import get_audit_log, log_actions
+from src.services.auth import require_api_key  # noqa: F401  (import check)
+from src.services.fallback import (
+    compute_html_hash,
+    compute_html_hash_bytes,
+    get_splash_html,
+    resolve_card_html,
+)
+from src.services import fallback
+from src.services.scheduler import (
+    apply_override,
+    delete_schedule_date,
+    upsert_schedule_entry,
+)
+from src.services.swap import execute_midnight_swap, get_today
+from src.services.templates import (
+    create_template,
+    delete_template,
+    get_template,
+    list_templates,
+)
+
+
+# SHA-256 of the sample snippets; a changed digest means the algorithm changed
+HELLO_SHA256 = "55486289576c734c46fe5bfe662f51a4c31c1ffba3ebe0e497f263d1af299cc1"
+WORLD_SHA256 = "ac25919db15adc0a6019e97eb3f40155494ee1e323d40efe34ea11a0b920bc90"
+
+# Validators built once at import and reused by every parametrized case
+ENTRY_TA = TypeAdapter(ScheduleEntry)
+PUSH_TA = TypeAdapter(SchedulePushRequest)
+TEMPLATE_CREATE_TA = TypeAdapter(TemplateCreateRequest)
+CLONE_DAY_TA = TypeAdapter(CloneDayRequest)
+CLONE_WEEK_TA = TypeAdapter(CloneWeekRequest)
+
+# Fixed schedule date so results never depend on the wall clock
+REF_DATE = date(2026, 2, 23)
+
+MAINBOARD_ENTRY = dict(
+    schedule_date=REF_DATE,
+    board_type="mainboard",
+    workout_title="Test Workout",
+    html_content="<div>Test</div>",
+)
+MODBOARD_ENTRY = dict(
+    schedule_date=REF_DATE,
+    board_type="modboard",
+    workout_title="Legs Web",
+    html_content="<div>Legs</div>",
+    version="mod",
+)
+
+
+@pytest.mark.parametrize("adapter, data, expected", [
+    pytest.param(
+        ENTRY_TA, MAINBOARD_ENTRY, {"board_type": "mainboard"},
+        id="entry-valid-board",
+    ),
+    pytest.param(
+        ENTRY_TA, {**MAINBOARD_ENTRY, "board_type": "invalid"}, None,
+        id="entry-invalid-board",
+    ),
+    pytest.param(
+        PUSH_TA, {"entries": [MODBOARD_ENTRY]},
+        {"entries": [ScheduleEntry.model_construct(**MODBOARD_ENTRY)]},
+        id="push-wraps-entries",
+    ),
+    pytest.param(
+        TEMPLATE_CREATE_TA,
+        {"name": "Test Template", "board_type": "mainboard", "version": "rx",
+         "html_content": "<div>Template</div>"},
+        {"name": "Test Template", "board_type": "mainboard"},
+        id="template-create",
+    ),
+    pytest.param(
+        CLONE_DAY_TA,
+        {"source_date": date(2026, 2, 23), "target_date": date(2026, 3, 2),
+         "board_type": "mainboard"},
+        {"source_date": date(2026, 2, 23), "board_type": "mainboard"},
+        id="clone-day",
+    ),
+    pytest.param(
+        CLONE_DAY_TA,
+        {"source_date": date(2026, 2, 23), "target_date": date(2026, 3, 2)},
+        {"board_type": None},  # no board copies both
+        id="clone-day-no-board",
+    ),
+    pytest.param(
+        CLONE_WEEK_TA,
+        {"source_week_start": date(2026, 2, 23), "target_week_start": date(2026, 3, 2)},
+        {"source_week_start": date(2026, 2, 23)},
+        id="clone-week",
+    ),
+])
+def test_schema_validation(adapter, data, expected):
+    """Request models accept valid input and reject invalid input."""
+    if expected is None:
+        with pytest.raises(ValidationError):
+            adapter.validate_python(data)
+        return
+    model = adapter.validate_python(data)
+    for field, value in expected.items():
+        assert getattr(model, field) == value
 
 
-def test_imports():
-    """Verify all modules are importable."""
-    from src.config import settings
-    from src.models.schemas import SchedulePushRequest, ScheduleEntryResponse
-    from src.services.auth import require_api_key
-    from src.services.templates import create_template, list_templates
-    assert settings.timezone == "America/Chicago"
-
+def test_schedule_push_request():
+    """SchedulePushRequest wraps already-validated entries as-is."""
+    entry = ENTRY_TA.validate_python(MODBOARD_ENTRY)
+    req = SchedulePushRequest.model_construct(entries=[entry])
+    assert len(req.entries) == 1
+    assert req.entries[0] is entry
+    assert req.entries[0].board_type == "modboard"
+    assert req.entries[0].version == "mod"
 
-def test_board_type_validation():
-    """Verify board_type enum constraints."""
-    from src.models.schemas import ScheduleEntry
 
-    # Valid entry
-    entry = ScheduleEntry(
-        schedule_date=date.today(),
+def _make_push(n: int) -> SchedulePushRequest:
+    """Build an n-entry push request without running validation."""
+    entry = ScheduleEntry.model_construct(
+        schedule_date=REF_DATE,
         board_type="mainboard",
-        workout_title="Test Workout",
-        html_content="<div>Test</div>",
+        workout_title="x",
+        html_content="<div/>",
     )
-    assert entry.board_type == "mainboard"
-
+    return SchedulePushRequest.model_construct(entries=[entry] * n)
 
-def test_board_type_invalid():
-    """Verify invalid board_type is rejected."""
-    from pydantic import ValidationError
-    from src.models.schemas import ScheduleEntry
 
-    with pytest.raises(ValidationError):
-        ScheduleEntry(
-            schedule_date=date.today(),
-            board_type="invalid",
-            workout_title="Test",
-            html_content="<div>Test</div>",
-        )
+@pytest.mark.parametrize("n", [1, 100, 10_000])
+def test_schedule_push_request_scaling(n):
+    """Large pushes can be assembled without paying per-entry validation."""
+    req = _make_push(n)
+    assert len(req.entries) == n
+    assert req.entries[-1].schedule_date == REF_DATE
 
 
-def test_schedule_push_request():
-    """Verify SchedulePushRequest wraps entries correctly."""
-    from src.models.schemas import SchedulePushRequest, ScheduleEntry
-
-    entry = ScheduleEntry(
-        schedule_date=date.today(),
-        board_type="modboard",
-        workout_title="Legs Web",
-        html_content="<div>Legs</div>",
-        version="mod",
+def test_push_card_at_upload_limit(client):
+    """An image card at the dashboard's upload limit is accepted by the API."""
+    # Same shape processFile() in dashboard.js builds for a PNG upload
+    data = base64.b64encode(b"\x00" * UPLOAD_MAX_BYTES).decode()
+    html = (
+        "<!DOCTYPE html>\n<html><head>\n<meta charset=\"UTF-8\">\n</head><body>\n"
+        f'<img src="data:image/png;base64,{data}" alt="Workout Card">\n'
+        "</body></html>"
     )
-    req = SchedulePushRequest(entries=[entry])
-    assert len(req.entries) == 1
-    assert req.entries[0].board_type == "modboard"
-    assert req.entries[0].version == "mod"
+    r = client.post("/api/schedule", json={"entries": [{
+        "schedule_date": str(get_today() + timedelta(days=1)),
+        "board_type": "mainboard",
+        "workout_title": "Image Card",
+        "html_content": html,
+    }]})
+    assert r.status_code == 200, r.text[:200]
+    assert r.json()["scheduled"] == 1
 
 
 def test_fallback_hash():
-    """Test HTML hash computation."""
-    from src.services.fallback import compute_html_hash
-
-    h1 = compute_html_hash("<div>Hello</div>")
-    h2 = compute_html_hash("<div>Hello</div>")
-    h3 = compute_html_hash("<div>World</div>")
-
-    assert h1 == h2
-    assert h1 != h3
-    assert len(h1) == 64  # SHA256 hex digest
+    """HTML hashes match frozen SHA-256 vectors."""
+    assert compute_html_hash("<div>Hello</div>") == HELLO_SHA256
+    assert compute_html_hash("<div>World</div>") == WORLD_SHA256
+
+
+def test_fallback_hash_bytes():
+    """Pre-encoded HTML hashes to the same digest without re-encoding."""
+    html = b"<div>Hello</div>"
+    assert compute_html_hash_bytes(html) == HELLO_SHA256
+    assert compute_html_hash_bytes(memoryview(html)) == HELLO_SHA256
+    assert compute_html_hash(html) == HELLO_SHA256
+
+
+async def test_resolve_card_html_null_hash(db):
+    """A Layer 1 row with no stored hash still resolves to its content hash."""
+    await db.execute(
+        """INSERT INTO tv_schedule (schedule_date, board_type, workout_title,
+                                    html_content, html_hash, status)
+           VALUES (?, 'mainboard', 'Legacy', '<div>Hello</div>', NULL, 'live')""",
+        (str(REF_DATE),),
+    )
+    html, layer, html_hash = await resolve_card_html(db, REF_DATE, "mainboard", db)
+    assert (html, layer, html_hash) == ("<div>Hello</div>", 1, HELLO_SHA256)
 
 
 def test_splash_html():
     """Test splash screen fallback."""
-    from src.services.fallback import get_splash_html
-
     html = get_splash_html()
     assert "ATC" in html
     assert "ATC" in html
+    assert get_splash_html() is html  # served from memory after first read
 
 
 def test_settings_defaults():
     """Verify settings default values."""
-    from src.config import settings
-
+    assert settings.timezone == "America/Chicago"
     assert settings.swap_hour == 0
     assert settings.swap_minute == 0
     assert settings.tv_refresh_interval_seconds == 60
@@ -94,92 +220,31 @@ def test_settings_defaults():
 
 def test_settings_api_key_default():
     """Verify API key defaults to empty (auth disabled)."""
-    from src.config import settings
     assert settings.api_key == ""
 
 
-def test_template_schemas():
-    """Verify template request/response models."""
-    from src.models.schemas import TemplateCreateRequest, TemplateResponse
-    from datetime import datetime
-
-    req = TemplateCreateRequest(
-        name="Test Template",
-        board_type="mainboard",
-        version="rx",
-        html_content="<div>Template</div>",
-    )
-    assert req.name == "Test Template"
-    assert req.board_type == "mainboard"
-
+SAMPLE_TEMPLATES = [
+    "legs_and_loaded.html",
+    "flexecution_day.html",
+    "legs_web.html",
+    "bermuda_triangle.html",
+    "leg_relay.html",
+]
 
-def test_clone_schemas():
-    """Verify clone request models."""
-    from src.models.schemas import CloneDayRequest, CloneWeekRequest
 
-    clone_day = CloneDayRequest(
-        source_date=date(2026, 2, 23),
-        target_date=date(2026, 3, 2),
-        board_type="mainboard",
-    )
-    assert clone_day.source_date == date(2026, 2, 23)
-    assert clone_day.board_type == "mainboard"
-
-    clone_week = CloneWeekRequest(
-        source_week_start=date(2026, 2, 23),
-        target_week_start=date(2026, 3, 2),
-    )
-    assert clone_week.source_week_start == date(2026, 2, 23)
+@pytest.mark.parametrize("filename", SAMPLE_TEMPLATES)
+def test_sample_template(filename, sample_templates):
+    """Verify each sample HTML template exists and looks like a page."""
+    assert filename in sample_templates, f"Missing sample template: {filename}"
+    with open(sample_templates[filename].path, "rb") as f:
+        assert os.fstat(f.fileno()).st_size > 100, f"Sample template too small: {filename}"
+        # Search the mapped file in place: no read buffer, no decode
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            assert mm.find(b"<!DOCTYPE html>") != -1, f"Not valid HTML: {filename}"
 
 
-def test_clone_day_no_board():
-    """Clone day request with no board copies both."""
-    from src.models.schemas import CloneDayRequest
-
-    clone = CloneDayRequest(
-        source_date=date(2026, 2, 23),
-        target_date=date(2026, 3, 2),
-    )
-    assert clone.board_type is None
-
-
-def test_sample_templates_exist():
-    """Verify all 5 sample HTML template files exist."""
-    samples_dir = Path("src/static/samples")
-    expected = [
-        "legs_and_loaded.html",
-        "flexecution_day.html",
-        "legs_web.html",
-        "bermuda_triangle.html",
-        "leg_relay.html",
-    ]
-    for filename in expected:
-        filepath = samples_dir / filename
-        assert filepath.exists(), f"Missing sample template: {filename}"
-        content = filepath.read_text()
-        assert len(content) > 100, f"Sample template too small: {filename}"
-        assert "<!DOCTYPE html>" in content, f"Not valid HTML: {filename}"
-
-
-@pytest.mark.asyncio
-async def test_template_crud():
+async def test_template_crud(db):
     """Test template create/list/delete operations."""
-    import aiosqlite
-    from src.services.templates import create_template, get_template, list_templates, delete_template
-
-    db = await aiosqlite.connect(":memory:")
-    db.row_factory = aiosqlite.Row
-    await db.executescript("""
-        CREATE TABLE IF NOT EXISTS card_templates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            board_type TEXT NOT NULL,
-            version TEXT,
-            html_content TEXT NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
 
     # Create
     row_id = await create_template(db, "Test Card", "mainboard", "<div>Test</div>", "rx")
@@ -207,50 +272,187 @@ async def test_template_crud():
     tmpl = await get_template(db, row_id)
     assert tmpl is None
 
-    await db.close()
 
+def test_audit_log_signature():
+    """There is exactly one get_audit_log, and it is the keyset-paginated one."""
+    params = list(inspect.signature(get_audit_log).parameters)
+    assert params == ["db", "page_size", "cursor", "action_filter", "board_filter"]
 
-@pytest.mark.asyncio
-async def test_audit_log_pagination():
+
+async def test_audit_log_pagination(db):
     """Test audit log with pagination and filtering."""
-    import aiosqlite
-    from src.services.audit import log_action, get_audit_log
-
-    db = await aiosqlite.connect(":memory:")
-    db.row_factory = aiosqlite.Row
-    await db.executescript("""
-        CREATE TABLE IF NOT EXISTS tv_audit_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            action TEXT NOT NULL,
-            schedule_date DATE,
-            board_type TEXT,
-            details TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    # Create some entries
-    await log_action(db, "schedule", date(2026, 2, 23), "mainboard", {"title": "Test"})
-    await log_action(db, "edit", date(2026, 2, 23), "mainboard", {"changes": ["html"]})
-    await log_action(db, "schedule", date(2026, 2, 24), "modboard", {"title": "Test2"})
+
+    # Create some entries in one statement and one commit
+    await log_actions(db, [
+        ("schedule", date(2026, 2, 23), "mainboard", {"title": "Test"}),
+        ("edit", date(2026, 2, 23), "mainboard", {"changes": ["html"]}),
+        ("schedule", date(2026, 2, 24), "modboard", {"title": "Test2"}),
+    ])
+    await db.commit()
 
     # All entries
-    entries, total = await get_audit_log(db, page=1, page_size=50)
-    assert total == 3
+    entries, next_cursor = await get_audit_log(db, page_size=50)
     assert len(entries) == 3
+    assert next_cursor is None
 
     # Filter by action
-    entries, total = await get_audit_log(db, page=1, page_size=50, action_filter="schedule")
-    assert total == 2
+    entries, _ = await get_audit_log(db, page_size=50, action_filter="schedule")
+    assert len(entries) == 2
 
     # Filter by board
-    entries, total = await get_audit_log(db, page=1, page_size=50, board_filter="modboard")
-    assert total == 1
+    entries, _ = await get_audit_log(db, page_size=50, board_filter="modboard")
+    assert len(entries) == 1
     assert entries[0]["board_type"] == "modboard"
 
-    # Pagination
-    entries, total = await get_audit_log(db, page=1, page_size=2)
-    assert total == 3
+    # Keyset pagination walks newest-first without overlap
+    entries, next_cursor = await get_audit_log(db, page_size=2)
     assert len(entries) == 2
-
-    await db.close()
+    assert next_cursor is not None
+    rest, next_cursor = await get_audit_log(db, page_size=2, cursor=next_cursor)
+    assert len(rest) == 1
+    assert next_cursor is None
+    assert [e["action"] for e in entries + rest] == ["schedule", "edit", "schedule"]
+
+
+def test_timestamps_are_epoch_ms(client):
+    """Timestamps go out as integer epoch-ms, and OpenAPI says so."""
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert schemas["AuditLogEntry"]["properties"]["timestamp"]["type"] == "integer"
+    for field in ("created_at", "updated_at"):
+        assert schemas["ScheduleEntryResponse"]["properties"][field]["type"] == "integer"
+
+    client.post("/api/schedule", json={"entries": [{
+        "schedule_date": str(get_today() + timedelta(days=1)),
+        "board_type": "mainboard",
+        "workout_title": "Test",
+        "html_content": "<div>Hello</div>",
+    }]})
+    entries = client.get("/api/schedule/audit").json()["entries"]
+    assert entries and all(isinstance(e["timestamp"], int) for e in entries)
+
+
+async def test_snapshot_matches_db_after_swap(db, tmp_path, monkeypatch):
+    """The JSON snapshot tracks the DB through override, delete and swap."""
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "_cache_path", None)
+    monkeypatch.setattr(settings, "backup_json_path", str(tmp_path / "backup.json"))
+    monkeypatch.setattr(fallback, "_snapshot", None)
+
+    today = get_today()
+    yesterday, tomorrow = today - timedelta(days=1), today + timedelta(days=1)
+    await upsert_schedule_entry(db, yesterday, "mainboard", "Y", "<p>y</p>", status="live")
+    await upsert_schedule_entry(db, today, "mainboard", "T", "<p>t</p>")
+    await upsert_schedule_entry(db, today, "modboard", "T", "<p>t</p>", status="live")
+    await upsert_schedule_entry(db, tomorrow, "mainboard", "N", "<p>n</p>")
+    await apply_override(db, "modboard", html_content="<p>o</p>")
+    await delete_schedule_date(db, tomorrow)
+    await execute_midnight_swap(db)
+
+    snapshot = json.loads((tmp_path / "backup.json").read_bytes())
+    in_snapshot = {
+        (entry["date"], board)
+        for entry in snapshot["entries"]
+        for board in entry if board != "date"
+    }
+    cursor = await db.execute(
+        """SELECT schedule_date, board_type FROM tv_schedule
+           WHERE status IN ('scheduled', 'live')"""
+    )
+    assert in_snapshot == {tuple(row) for row in await cursor.fetchall()}
+    assert in_snapshot == {(str(today), "mainboard")}
+
+
+def test_tv_etag_revalidation(client):
+    """A TV revalidating with its ETag gets 304 until the card changes."""
+    today = str(get_today())
+    client.post("/api/schedule", json={"entries": [{
+        "schedule_date": today,
+        "board_type": "mainboard",
+        "workout_title": "Test",
+        "html_content": "<div>Hello</div>",
+    }]})
+
+    r = client.get("/tv/mainboard")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert etag.startswith(f'W/"{HELLO_SHA256}-')
+
+    r = client.get("/tv/mainboard", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+
+    r = client.put(f"/api/schedule/{today}/mainboard", json={"html_content": "<div>World</div>"})
+    assert r.status_code == 200
+    r = client.get("/tv/mainboard", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert r.headers["etag"].startswith(f'W/"{WORLD_SHA256}-')
+    assert "<div>World</div>" in r.text
+
+
+# Schema as shipped before the index and unix-ms timestamp changes
+LEGACY_SCHEMA_SQL = """
+CREATE TABLE tv_schedule (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    schedule_date   DATE NOT NULL,
+    board_type      TEXT NOT NULL CHECK(board_type IN ('mainboard', 'modboard')),
+    workout_title   TEXT NOT NULL,
+    workout_date_label TEXT,
+    version         TEXT CHECK(version IN ('rx', 'scaled', 'mod')),
+    html_content    TEXT NOT NULL,
+    html_hash       TEXT,
+    status          TEXT DEFAULT 'scheduled' CHECK(status IN ('scheduled', 'live', 'archived', 'overridden')),
+    created_at      DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at      DATETIME DEFAULT CURRENT_TIMESTAMP,
+    pushed_by       TEXT,
+    UNIQUE(schedule_date, board_type)
+);
+CREATE INDEX idx_schedule_date ON tv_schedule(schedule_date);
+CREATE INDEX idx_schedule_status ON tv_schedule(status);
+
+CREATE TABLE tv_audit_log (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    action          TEXT NOT NULL,
+    schedule_date   DATE,
+    board_type      TEXT,
+    details         TEXT,
+    timestamp       DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_audit_timestamp ON tv_audit_log(timestamp);
+
+CREATE TABLE card_templates (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    name            TEXT NOT NULL UNIQUE,
+    board_type      TEXT NOT NULL CHECK(board_type IN ('mainboard', 'modboard')),
+    version         TEXT CHECK(version IN ('rx', 'scaled', 'mod')),
+    html_content    TEXT NOT NULL,
+    created_at      DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at      DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_template_board ON card_templates(board_type);
+"""
+
+
+async def test_init_db_upgrades_legacy_db(tmp_path, monkeypatch):
+    """init_db migrates a pre-existing DB: old indexes dropped, timestamps to unix-ms."""
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA_SQL)
+        conn.execute(
+            """INSERT INTO tv_audit_log (action, timestamp)
+               VALUES ('schedule', '2026-02-23 12:00:00')"""
+        )
+    conn.close()
+    monkeypatch.setattr(database, "DATABASE_PATH", str(path))
+
+    await database.init_db()
+
+    with sqlite3.connect(path) as conn:
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+        timestamp = conn.execute("SELECT timestamp FROM tv_audit_log").fetchone()[0]
+    conn.close()
+    assert not indexes & {"idx_schedule_date", "idx_schedule_status", "idx_audit_timestamp"}
+    assert {"idx_sched_status_date", "idx_audit_ts_id", "idx_audit_action_ts"} <= indexes
+    assert timestamp == 1771848000000  # 2026-02-23T12:00:00Z